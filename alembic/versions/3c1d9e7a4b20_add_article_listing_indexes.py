@@ -0,0 +1,57 @@
+"""add article listing indexes
+
+Revision ID: 3c1d9e7a4b20
+Revises: a7a1cdbea83c
+Create Date: 2026-10-18 10:12:31.402917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d9e7a4b20'
+down_revision: Union[str, Sequence[str], None] = 'a7a1cdbea83c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_articles_scheduled_listing',
+            'articles',
+            ['scheduled_date', 'id'],
+            postgresql_where=sa.text('scheduled_date IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_articles_archived_listing',
+            'articles',
+            ['archived_date', 'id'],
+            postgresql_where=sa.text('archived_date IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_articles_archived_listing',
+            table_name='articles',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_articles_scheduled_listing',
+            table_name='articles',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
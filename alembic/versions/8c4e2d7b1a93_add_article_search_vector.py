@@ -0,0 +1,64 @@
+"""add article search vector
+
+Adds a stored generated tsvector over title and content with a GIN index.
+Adding a stored generated column rewrites the table under an exclusive
+lock, so run this during a maintenance window on large installations.
+
+Revision ID: 8c4e2d7b1a93
+Revises: f3b8a1c6d092
+Create Date: 2026-10-18 18:21:37.664015
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2d7b1a93'
+down_revision: Union[str, Sequence[str], None] = 'f3b8a1c6d092'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'articles',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+    )
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_articles_search_vector',
+            'articles',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_articles_search_vector',
+            table_name='articles',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column('articles', 'search_vector')
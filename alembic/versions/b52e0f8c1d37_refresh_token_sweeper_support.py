@@ -0,0 +1,66 @@
+"""refresh token sweeper support
+
+Revision ID: b52e0f8c1d37
+Revises: 3c1d9e7a4b20
+Create Date: 2026-10-18 14:02:47.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e0f8c1d37'
+down_revision: Union[str, Sequence[str], None] = '3c1d9e7a4b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Deleting an expired parent must not fail while its children are alive.
+    # NOT VALID + VALIDATE avoids holding an exclusive lock during the scan.
+    op.drop_constraint(
+        'refresh_tokens_parent_token_id_fkey', 'refresh_tokens', type_='foreignkey'
+    )
+    op.execute(
+        'ALTER TABLE refresh_tokens ADD CONSTRAINT refresh_tokens_parent_token_id_fkey '
+        'FOREIGN KEY (parent_token_id) REFERENCES refresh_tokens (id) '
+        'ON DELETE SET NULL NOT VALID'
+    )
+    op.execute(
+        'ALTER TABLE refresh_tokens VALIDATE CONSTRAINT refresh_tokens_parent_token_id_fkey'
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_refresh_tokens_expires_at'),
+            'refresh_tokens',
+            ['expires_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_refresh_tokens_expires_at'),
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_constraint(
+        'refresh_tokens_parent_token_id_fkey', 'refresh_tokens', type_='foreignkey'
+    )
+    op.create_foreign_key(
+        'refresh_tokens_parent_token_id_fkey',
+        'refresh_tokens',
+        'refresh_tokens',
+        ['parent_token_id'],
+        ['id'],
+    )
@@ -0,0 +1,123 @@
+"""add article status
+
+Stores the publication state derived from scheduled_date and archived_date,
+kept current by the application's article status scheduler, and replaces the
+date based listing indexes with partial indexes per status.
+
+Revision ID: f3b8a1c6d092
+Revises: b52e0f8c1d37
+Create Date: 2026-10-18 17:05:44.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8a1c6d092'
+down_revision: Union[str, Sequence[str], None] = 'b52e0f8c1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default does not rewrite the table
+    op.add_column(
+        'articles',
+        sa.Column('status', sa.String(), server_default='published', nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE articles SET status = CASE
+            WHEN archived_date <= now() THEN 'archived'
+            WHEN scheduled_date > now() THEN 'scheduled'
+            ELSE 'published'
+        END
+        WHERE archived_date <= now() OR scheduled_date > now()
+        """
+    )
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_articles_scheduled',
+            'articles',
+            ['scheduled_date', 'id'],
+            postgresql_where=sa.text("status = 'scheduled'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_articles_published',
+            'articles',
+            ['id'],
+            postgresql_where=sa.text("status = 'published'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_articles_archived',
+            'articles',
+            ['archived_date', 'id'],
+            postgresql_where=sa.text("status = 'archived'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_articles_pending_archive',
+            'articles',
+            ['archived_date'],
+            postgresql_where=sa.text(
+                "status <> 'archived' AND archived_date IS NOT NULL"
+            ),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name in (
+            'ix_articles_scheduled_listing',
+            'ix_articles_archived_listing',
+        ):
+            op.drop_index(
+                name,
+                table_name='articles',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_articles_scheduled_listing',
+            'articles',
+            ['scheduled_date', 'id'],
+            postgresql_where=sa.text('scheduled_date IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_articles_archived_listing',
+            'articles',
+            ['archived_date', 'id'],
+            postgresql_where=sa.text('archived_date IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name in (
+            'ix_articles_pending_archive',
+            'ix_articles_archived',
+            'ix_articles_published',
+            'ix_articles_scheduled',
+        ):
+            op.drop_index(
+                name,
+                table_name='articles',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.drop_column('articles', 'status')
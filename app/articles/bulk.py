@@ -0,0 +1,235 @@
+import codecs
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+import asyncpg
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+
+from .scheduler import article_status, as_utc
+from .schemas import ArticleCreate, BulkResult, BulkRowError
+
+MAX_ROW_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+COPY_COLUMNS = ["title", "content", "scheduled_date", "archived_date", "status"]
+
+
+class ParseError(Exception):
+    pass
+
+
+class RowTooLarge(ParseError):
+    def __init__(self):
+        super().__init__(f"Rows must be smaller than {MAX_ROW_BYTES} bytes")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """Yield one decoded value, or a ParseError, per non-empty line.
+
+    An oversized line yields a RowTooLarge and is skipped up to the next
+    newline without being buffered.
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        if skipping:
+            end = chunk.find(b"\n")
+            if end == -1:
+                continue
+            chunk = chunk[end + 1 :]
+            skipping = False
+
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if len(line) > MAX_ROW_BYTES:
+                yield RowTooLarge()
+            elif line.strip():
+                yield _loads(line)
+        if len(buffer) > MAX_ROW_BYTES:
+            yield RowTooLarge()
+            buffer = b""
+            skipping = True
+    if buffer.strip():
+        yield _loads(buffer)
+
+
+def _loads(line: bytes) -> object:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ParseError(str(e))
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """Yield the elements of a top-level JSON array without reading it whole.
+
+    Only the element being decoded is buffered. A syntax error or oversized
+    element cannot be skipped, so it is yielded as a ParseError and ends the
+    stream.
+    """
+    decoder = json.JSONDecoder()
+    # Multi-byte characters may be split across chunks
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+    done = False
+    last_error = None
+
+    async for chunk in chunks:
+        try:
+            decoded = text.decode(chunk)
+        except UnicodeDecodeError as e:
+            yield ParseError(str(e))
+            return
+        if done:
+            # Only whitespace may follow the array, and it is not buffered
+            if decoded.strip():
+                yield ParseError("Unexpected data after the array")
+                return
+            continue
+        buffer = buffer[position:] + decoded
+        position = 0
+
+        while not done:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                break
+
+            if not started:
+                if buffer[position] != "[":
+                    yield ParseError("Expected a JSON array")
+                    return
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                done = True
+                if buffer[position + 1 :].strip():
+                    yield ParseError("Unexpected data after the array")
+                    return
+                break
+
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except ValueError as e:
+                # Most likely an element split across chunks, wait for more
+                if len(buffer) - position > MAX_ROW_BYTES:
+                    yield RowTooLarge()
+                    return
+                last_error = e
+                break
+            else:
+                last_error = None
+                yield value
+
+    if not done and buffer[position:].strip():
+        yield ParseError(str(last_error) if last_error else "Unterminated array")
+
+
+class BulkIngest:
+    """Validates streamed articles and writes them in chunks.
+
+    Each chunk is committed on its own, so memory and transaction size stay
+    bounded and rows before a failure remain stored. COPY is the fast path;
+    multi-row INSERT ... RETURNING is used when the caller wants the ids.
+    """
+
+    def __init__(self, db: AsyncSession, chunk_size: int, return_ids: bool):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.return_ids = return_ids
+        self.result = BulkResult(
+            inserted=0, failed=0, errors=[], ids=[] if return_ids else None
+        )
+
+    async def run(self, rows: AsyncIterator[object]) -> BulkResult:
+        chunk: list[tuple[int, ArticleCreate]] = []
+        index = 0
+        async for row in rows:
+            article = self._validate(index, row)
+            if article is not None:
+                chunk.append((index, article))
+            if len(chunk) >= self.chunk_size:
+                await self._write(chunk)
+                chunk = []
+            index += 1
+
+        if chunk:
+            await self._write(chunk)
+        return self.result
+
+    def _validate(self, index: int, row: object) -> ArticleCreate | None:
+        if isinstance(row, RowTooLarge):
+            self._fail(index, [str(row)])
+            return None
+        if isinstance(row, ParseError):
+            self._fail(index, [f"Invalid JSON: {row}"])
+            return None
+        try:
+            return ArticleCreate.model_validate(row)
+        except ValidationError as e:
+            self._fail(
+                index,
+                [
+                    f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+                    for error in e.errors()
+                ],
+            )
+            return None
+
+    def _fail(self, index: int, errors: list[str]):
+        self.result.failed += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(BulkRowError(index=index, errors=errors))
+
+    async def _write(self, chunk: list[tuple[int, ArticleCreate]]):
+        now = datetime.now(timezone.utc)
+        records = [
+            (
+                article.title,
+                article.content,
+                as_utc(article.scheduled_date),
+                as_utc(article.archived_date),
+                article_status(article.scheduled_date, article.archived_date, now),
+            )
+            for _, article in chunk
+        ]
+
+        try:
+            if self.return_ids:
+                # Row order of a multi-row RETURNING is not guaranteed,
+                # SQLAlchemy restores the parameter order
+                result = await self.db.execute(
+                    insert(models.Article).returning(
+                        models.Article.id, sort_by_parameter_order=True
+                    ),
+                    [dict(zip(COPY_COLUMNS, record)) for record in records],
+                )
+                ids = result.scalars().all()
+            else:
+                connection = await self.db.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    models.Article.__tablename__,
+                    records=records,
+                    columns=COPY_COLUMNS,
+                )
+            await self.db.commit()
+        except (SQLAlchemyError, asyncpg.PostgresError) as e:
+            await self.db.rollback()
+            for index, _ in chunk:
+                self._fail(index, [f"Database error: {str(e)}"])
+            return
+
+        self.result.inserted += len(chunk)
+        if self.return_ids:
+            self.result.ids.extend(ids)
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import secrets
+import time
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from app.cache import LRUCache
+from app.config import env
+from app.db.redis_cilent import (
+    get_redis,
+    publish,
+    register_script,
+    run_script,
+    subscribe,
+)
+from app.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "articles:version"
+INVALIDATION_CHANNEL = "articles:invalidate"
+LOCK_POLL_SECONDS = 0.02
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+register_script("article_cache_unlock", RELEASE_LOCK_SCRIPT)
+
+# Loads a missing entry, returning the value and its TTL (None for the default)
+Loader = Callable[[], Awaitable[tuple[str, float | None]]]
+
+
+class ArticleCache:
+    """Read-through cache of serialized article responses.
+
+    Entries live in Redis under keys that embed a global version, with a
+    short-lived in-process L1 in front. A write bumps the version instead of
+    deleting keys, and entries under old versions simply expire. Readers fetch
+    the version before querying the database, but a query on a lagging replica
+    can still return data older than the version it is stored under, so fills
+    from replica reads pass a TTL bounded by the replica lag.
+    """
+
+    def __init__(
+        self, ttl: float, l1_size: int, l1_ttl: float, lock_timeout: float = 0
+    ):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.l1 = LRUCache(maxsize=l1_size, ttl=l1_ttl)
+        self.stats = {"loads": 0, "coalesced": 0, "lock_waits": 0}
+        self._version: int | None = None
+        self._version_checked_at = 0.0
+        self._inflight: dict[tuple[int | None, str], asyncio.Future] = {}
+
+    async def version(self) -> int | None:
+        """Current version, None when Redis is down and the cache is bypassed."""
+        # Pub/sub keeps the version fresh, re-read it in case a message was lost
+        if (
+            self._version is None
+            or time.monotonic() - self._version_checked_at > self.l1.ttl
+        ):
+            try:
+                redis_client = await get_redis()
+                self._version = int(await redis_client.get(VERSION_KEY) or 0)
+            except RedisError as e:
+                logger.error(f"Article cache unavailable: {str(e)}")
+                return None
+            self._version_checked_at = time.monotonic()
+        return self._version
+
+    async def get(self, version: int | None, key: str) -> str | None:
+        if version is None:
+            return None
+
+        key = f"articles:v{version}:{key}"
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+
+        try:
+            redis_client = await get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                value, ttl_ms = await pipe.get(key).pttl(key).execute()
+        except RedisError as e:
+            logger.error(f"Failed to read article cache: {str(e)}")
+            return None
+
+        if value is not None and ttl_ms > 0:
+            self.l1.set(key, value, ttl_ms / 1000)
+        return value
+
+    async def set(
+        self, version: int | None, key: str, value: str, ttl: float | None = None
+    ):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if version is None or ttl <= 0:
+            return
+
+        key = f"articles:v{version}:{key}"
+        try:
+            redis_client = await get_redis()
+            await redis_client.set(key, value, px=int(ttl * 1000))
+        except RedisError as e:
+            logger.error(f"Failed to write article cache: {str(e)}")
+            return
+        self.l1.set(key, value, ttl)
+
+    async def get_many(self, version: int | None, keys: list[str]) -> dict[str, str]:
+        """Get several entries with at most one Redis round trip."""
+        if version is None:
+            return {}
+
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.l1.get(f"articles:v{version}:{key}")
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        if not missing:
+            return found
+
+        try:
+            redis_client = await get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key in missing:
+                    full_key = f"articles:v{version}:{key}"
+                    pipe.get(full_key).pttl(full_key)
+                replies = await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Failed to read article cache: {str(e)}")
+            return found
+
+        for key, value, ttl_ms in zip(missing, replies[::2], replies[1::2]):
+            if value is not None and ttl_ms > 0:
+                found[key] = value
+                self.l1.set(f"articles:v{version}:{key}", value, ttl_ms / 1000)
+        return found
+
+    async def set_many(
+        self, version: int | None, values: dict[str, str], ttl: float | None = None
+    ):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if version is None or not values or ttl <= 0:
+            return
+
+        try:
+            redis_client = await get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(f"articles:v{version}:{key}", value, px=int(ttl * 1000))
+                await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Failed to write article cache: {str(e)}")
+            return
+        for key, value in values.items():
+            self.l1.set(f"articles:v{version}:{key}", value, ttl)
+
+    async def fetch(self, version: int | None, key: str, load: Loader) -> str:
+        """Get an entry, loading it once per worker however many requests miss.
+
+        Concurrent callers for the same key await the first caller's load and
+        share its result or exception. With a lock timeout set, workers also
+        take a Redis lock so only one of them queries the database.
+        """
+        value = await self.get(version, key)
+        if value is not None:
+            return value
+
+        flight_key = (version, key)
+        while (future := self._inflight.get(flight_key)) is not None:
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leading request was cancelled, follow whoever took over
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            value = await self._load(version, key, load)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting, mark the exception as retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(flight_key) is future:
+                del self._inflight[flight_key]
+
+    async def _load(self, version: int | None, key: str, load: Loader) -> str:
+        lock_key = f"articles:v{version}:lock:{key}"
+        token = None
+        if self.lock_timeout and version is not None:
+            token = secrets.token_hex(8)
+            try:
+                redis_client = await get_redis()
+                acquired = await redis_client.set(
+                    lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+                )
+            except RedisError as e:
+                logger.error(f"Failed to lock article cache entry: {str(e)}")
+                acquired, token = True, None
+
+            if not acquired:
+                token = None
+                value = await self._wait_for(version, key)
+                if value is not None:
+                    return value
+
+        try:
+            self.stats["loads"] += 1
+            value, ttl = await load()
+            await self.set(version, key, value, ttl)
+            return value
+        finally:
+            if token is not None:
+                try:
+                    await run_script("article_cache_unlock", [lock_key], [token])
+                except RedisError as e:
+                    logger.error(f"Failed to unlock article cache entry: {str(e)}")
+
+    async def _wait_for(self, version: int, key: str) -> str | None:
+        """Poll for an entry another worker is loading, up to the lock timeout."""
+        self.stats["lock_waits"] += 1
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            value = await self.get(version, key)
+            if value is not None:
+                return value
+        return None
+
+    async def invalidate(self):
+        try:
+            redis_client = await get_redis()
+            version = await redis_client.incr(VERSION_KEY)
+            self._on_invalidate(str(version))
+            await publish(INVALIDATION_CHANNEL, str(version))
+        except RedisError as e:
+            self.l1.clear()
+            logger.error(f"Failed to invalidate article cache: {str(e)}")
+
+    def _on_invalidate(self, version: str):
+        self._version = max(int(version), self._version or 0)
+        self._version_checked_at = time.monotonic()
+        self.l1.clear()
+
+
+article_cache = ArticleCache(
+    ttl=env.ARTICLE_CACHE_TTL_SECONDS,
+    l1_size=env.ARTICLE_CACHE_L1_SIZE,
+    l1_ttl=env.ARTICLE_CACHE_L1_TTL_SECONDS,
+    lock_timeout=env.ARTICLE_CACHE_LOCK_TIMEOUT_SECONDS,
+)
+
+subscribe(INVALIDATION_CHANNEL, article_cache._on_invalidate)
+register_collector(
+    "article_cache", lambda: {**article_cache.l1.stats(), **article_cache.stats}
+)
@@ -0,0 +1,43 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+INVALID_CURSOR_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+)
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(scope: str, values: tuple) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    payload = {"s": scope, "k": [_dump_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str, size: int) -> tuple:
+    """Decode a cursor produced by `encode_cursor` for the same scope."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = tuple(_load_value(value) for value in payload["k"])
+    except (ValueError, KeyError, TypeError):
+        raise INVALID_CURSOR_EXCEPTION
+
+    if payload.get("s") != scope or len(values) != size:
+        raise INVALID_CURSOR_EXCEPTION
+
+    return values
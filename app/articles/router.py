@@ -1,76 +1,300 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import and_, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Integer, any_, bindparam, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from app.config import env
 from app.db import get_db, models
+from app.db.replicas import get_read_db, max_staleness
 
-from .schemas import Article, ArticleCreate, ArticleUpdate, Status
+from .bulk import BulkIngest, iter_json_array, iter_ndjson
+from .cache import article_cache
+from .export import MEDIA_TYPES, ExportFormat, stream_articles
+from .pagination import INVALID_CURSOR_EXCEPTION, decode_cursor, encode_cursor
+from .scheduler import article_status, status_is
+from .search import CURSOR_SCOPE, search_query
+from .schemas import (
+    Article,
+    ArticleCreate,
+    ArticleSearchResult,
+    ArticleSummary,
+    ArticleUpdate,
+    BulkResult,
+    Status,
+    View,
+)
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_BATCH_IDS = 100
+
+# Keyset ordering per status, the last column is always the unique id
+SORT_KEYS = {
+    "scheduled": (models.Article.scheduled_date, models.Article.id),
+    "published": (models.Article.id,),
+    "archived": (models.Article.archived_date, models.Article.id),
+}
+
+ARTICLE_LISTS = {
+    "full": TypeAdapter(list[Article]),
+    "summary": TypeAdapter(list[ArticleSummary]),
+}
+SUMMARY_COLUMNS = load_only(
+    *(getattr(models.Article, field) for field in ArticleSummary.model_fields)
+)
+
+NDJSON_TYPES = {"application/x-ndjson", "application/jsonl"}
+
+
+def json_response(body: str, headers: dict | None = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.post("/", response_model=Article)
 async def create_article(article: ArticleCreate, db: AsyncSession = Depends(get_db)):
-    db_article = models.Article(**article.model_dump())
+    db_article = models.Article(
+        **article.model_dump(),
+        status=article_status(
+            article.scheduled_date, article.archived_date, datetime.now(timezone.utc)
+        ),
+    )
     db.add(db_article)
 
     await db.commit()
     await db.refresh(db_article)
+    await article_cache.invalidate()
 
     return db_article
 
 
-@router.get("/", response_model=list[Article])
-async def get_articles(
-    status: Status, limit=10, offset=0, db: AsyncSession = Depends(get_db)
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/ArticleCreate"},
+                    }
+                },
+                "application/x-ndjson": {
+                    "schema": {"$ref": "#/components/schemas/ArticleCreate"}
+                },
+            },
+        }
+    },
+)
+async def bulk_create_articles(
+    request: Request, return_ids: bool = False, db: AsyncSession = Depends(get_db)
 ):
-    now = datetime.now()
+    content_type = request.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type in NDJSON_TYPES:
+        rows = iter_ndjson(request.stream())
+    elif content_type == "application/json":
+        rows = iter_json_array(request.stream())
+    else:
+        raise HTTPException(
+            status_code=415, detail="Send a JSON array or application/x-ndjson"
+        )
 
-    if status == "scheduled":
-        query = select(models.Article).where(
-            and_(
-                models.Article.scheduled_date != None,
-                models.Article.scheduled_date > now,
-            )
+    ingest = BulkIngest(db, env.ARTICLE_BULK_CHUNK_SIZE, return_ids)
+    try:
+        return await ingest.run(rows)
+    finally:
+        # Chunks committed before a failure are stored
+        if ingest.result.inserted:
+            await article_cache.invalidate()
+
+
+def page_query(
+    status: Status, view: View, limit: int, after: str | None, offset: int | None
+):
+    query = select(models.Article).where(status_is(status))
+    if view == "summary":
+        # Leaves the content column out of the query entirely
+        query = query.options(SUMMARY_COLUMNS)
+
+    sort_keys = SORT_KEYS[status]
+    query = query.order_by(*sort_keys).limit(limit)
+
+    if after is not None:
+        *last_dates, last_id = decode_cursor(after, status, len(sort_keys))
+        if not isinstance(last_id, int) or not all(
+            isinstance(value, datetime) for value in last_dates
+        ):
+            raise INVALID_CURSOR_EXCEPTION
+        query = query.where(tuple_(*sort_keys) > tuple_(*last_dates, last_id))
+    elif offset:
+        # Legacy paging, kept for existing clients
+        query = query.offset(offset)
+    return query
+
+
+async def load_page(
+    db: AsyncSession,
+    status: Status,
+    view: View,
+    limit: int,
+    after: str | None,
+    offset: int | None,
+) -> tuple[str, float | None]:
+    query = page_query(status, view, limit, after, offset)
+    result = await db.execute(query)
+    articles = result.scalars().all()
+
+    sort_keys = SORT_KEYS[status]
+    next_cursor = ""
+    if len(articles) == limit:
+        last = articles[-1]
+        next_cursor = encode_cursor(
+            status, tuple(getattr(last, column.key) for column in sort_keys)
         )
-    elif status == "archived":
-        query = select(models.Article).where(
-            and_(
-                models.Article.archived_date != None, models.Article.archived_date < now
-            )
+
+    adapter = ARTICLE_LISTS[view]
+    body = adapter.dump_json(
+        adapter.validate_python(articles, from_attributes=True)
+    ).decode()
+
+    # The status scheduler invalidates the cache when articles change status
+    return f"{next_cursor}\n{body}", max_staleness(db)
+
+
+def parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = [int(id) for id in ids.split(",") if id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="'ids' must be comma separated")
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"Pass between 1 and {MAX_BATCH_IDS} ids"
         )
-    else:
-        query = select(models.Article).where(
-            and_(
-                or_(
-                    models.Article.scheduled_date == None,
-                    models.Article.scheduled_date < now,
-                ),
-                or_(
-                    models.Article.archived_date == None,
-                    models.Article.archived_date > now,
-                ),
+    return parsed
+
+
+async def load_by_ids(db: AsyncSession, ids: list[int]) -> str:
+    """JSON array of the articles in the requested order, null where missing."""
+    version = await article_cache.version()
+    cached = await article_cache.get_many(version, [f"item:{id}" for id in ids])
+    bodies = {id: cached[f"item:{id}"] for id in ids if f"item:{id}" in cached}
+
+    missing = list(dict.fromkeys(id for id in ids if id not in bodies))
+    if missing:
+        # One array parameter keeps a single prepared statement for any count
+        result = await db.execute(
+            select(models.Article).where(
+                models.Article.id
+                == any_(bindparam("ids", missing, type_=ARRAY(Integer)))
             )
         )
+        loaded = {
+            article.id: Article.model_validate(article).model_dump_json()
+            for article in result.scalars()
+        }
+        bodies.update(loaded)
+        await article_cache.set_many(
+            version,
+            {f"item:{id}": body for id, body in loaded.items()},
+            max_staleness(db),
+        )
+
+    return "[" + ",".join(bodies.get(id, "null") for id in ids) + "]"
+
+
+@router.get(
+    "/",
+    response_model=list[Article] | list[ArticleSummary] | list[Article | None],
+)
+async def get_articles(
+    status: Status | None = None,
+    ids: str | None = Query(
+        None, description="Comma separated ids to fetch instead of a listing"
+    ),
+    view: View = "full",
+    limit: int = Query(10, ge=1, le=100),
+    after: str | None = None,
+    offset: int | None = Query(None, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if ids is not None:
+        return json_response(await load_by_ids(db, parse_ids(ids)))
+
+    if status is None:
+        raise HTTPException(status_code=400, detail="Pass either 'status' or 'ids'")
+
+    if after is not None and offset is not None:
+        raise HTTPException(
+            status_code=400, detail="Use either 'after' or 'offset', not both"
+        )
+
+    page = await article_cache.fetch(
+        await article_cache.version(),
+        f"list:{status}:{view}:{limit}:{after or ''}:{offset or ''}",
+        lambda: load_page(db, status, view, limit, after, offset),
+    )
+
+    # The first line holds the next cursor, the rest is the JSON body
+    next_cursor, body = page.split("\n", 1)
+    return json_response(
+        body, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    )
 
-    result = await db.execute(query.limit(limit).offset(offset))
-    articles = result.scalars().all()
 
-    return articles
+@router.get("/search", response_model=list[ArticleSearchResult])
+async def search_articles(
+    response: Response,
+    q: str = Query(min_length=1, max_length=256),
+    status: Status | None = None,
+    limit: int = Query(10, ge=1, le=100),
+    after: str | None = None,
+    highlight: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    result = await db.execute(search_query(q, status, limit, after, highlight))
+    rows = result.mappings().all()
+
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            CURSOR_SCOPE, (last["rank"], last["id"])
+        )
+
+    return rows
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_articles(
+    format: ExportFormat = "ndjson", status: Status | None = None
+):
+    return StreamingResponse(
+        stream_articles(format, status, env.ARTICLE_EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="articles.{format}"'},
+    )
 
 
 @router.get("/{id}", response_model=Article)
-async def get_article(id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.Article).where(models.Article.id == id))
+async def get_article(id: int, db: AsyncSession = Depends(get_read_db)):
+    async def load() -> tuple[str, float | None]:
+        result = await db.execute(select(models.Article).where(models.Article.id == id))
 
-    article = result.scalar_one_or_none()
+        article = result.scalar_one_or_none()
 
-    if article is None:
-        raise HTTPException(status_code=404, detail="Article not found")
+        if article is None:
+            raise HTTPException(status_code=404, detail="Article not found")
 
-    return article
+        return Article.model_validate(article).model_dump_json(), max_staleness(db)
+
+    body = await article_cache.fetch(await article_cache.version(), f"item:{id}", load)
+    return json_response(body)
 
 
 @router.patch("/{id}", response_model=Article)
@@ -84,9 +308,12 @@ async def update_article(
     if article is None:
         raise HTTPException(status_code=404, detail="Article not found")
 
-    article.archived_date = datetime.now() if body.archive else None
+    now = datetime.now(timezone.utc)
+    article.archived_date = now if body.archive else None
+    article.status = article_status(article.scheduled_date, article.archived_date, now)
 
     await db.commit()
     await db.refresh(article)
+    await article_cache.invalidate()
 
     return article
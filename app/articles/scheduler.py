@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, case, func, literal, or_, select, update
+
+from app.config import env
+from app.db import AsyncSessionLocal, models
+from app.db.redis_cilent import publish, subscribe
+
+from .cache import INVALIDATION_CHANNEL, article_cache
+from .schemas import Status
+
+logger = logging.getLogger(__name__)
+
+STATUS_CHANNEL = "articles:status_changed"
+# Upper bound on a sleep, in case a wake-up was missed
+MAX_SLEEP_SECONDS = 60
+ERROR_RETRY_SECONDS = 5
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    # Naive datetimes from clients are stored as UTC by the database
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def article_status(
+    scheduled_date: datetime | None, archived_date: datetime | None, now: datetime
+) -> Status:
+    archived_date, scheduled_date = as_utc(archived_date), as_utc(scheduled_date)
+    if archived_date is not None and archived_date <= now:
+        return "archived"
+    if scheduled_date is not None and scheduled_date > now:
+        return "scheduled"
+    return "published"
+
+
+def status_is(status: Status, equal: bool = True):
+    """Status comparison the planner can match against the partial indexes.
+
+    The value is rendered into the SQL, since a generic plan for a prepared
+    statement cannot prove a partial index predicate from a parameter.
+    """
+    value = literal(status, literal_execute=True)
+    return models.Article.status == value if equal else models.Article.status != value
+
+
+def status_expression(now: datetime):
+    """SQL equivalent of `article_status`."""
+    return case(
+        (models.Article.archived_date <= now, "archived"),
+        (models.Article.scheduled_date > now, "scheduled"),
+        else_="published",
+    )
+
+
+def due_condition(now: datetime):
+    """Rows whose stored status is out of date."""
+    return or_(
+        and_(status_is("archived", False), models.Article.archived_date <= now),
+        and_(status_is("scheduled"), models.Article.scheduled_date <= now),
+    )
+
+
+class ArticleStatusScheduler:
+    """Background job keeping `Article.status` in line with its dates.
+
+    It sleeps until the next scheduled or archived date, then moves due rows
+    in batches. Each batch invalidates the article cache and is announced on
+    STATUS_CHANNEL. Writes wake it early when they bring the next date
+    closer. Rows are claimed with SKIP LOCKED, so every worker can run it.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def wake(self, *_):
+        self._wake.set()
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            timeout = MAX_SLEEP_SECONDS
+            try:
+                await self.flip_due()
+                boundary = await self.next_boundary()
+                if boundary is not None:
+                    delay = (boundary - datetime.now(timezone.utc)).total_seconds()
+                    timeout = min(max(delay, 0), MAX_SLEEP_SECONDS)
+            except Exception as e:
+                # Includes connection errors asyncpg raises unwrapped
+                logger.error(f"Article status update failed: {str(e)}")
+                timeout = ERROR_RETRY_SECONDS
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def next_boundary(self) -> datetime | None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    func.least(
+                        select(func.min(models.Article.scheduled_date))
+                        .where(status_is("scheduled"))
+                        .scalar_subquery(),
+                        select(func.min(models.Article.archived_date))
+                        .where(
+                            status_is("archived", False),
+                            models.Article.archived_date != None,
+                        )
+                        .scalar_subquery(),
+                    )
+                )
+            )
+            return result.scalar_one()
+
+    async def flip_due(self) -> int:
+        flipped = 0
+        while True:
+            now = datetime.now(timezone.utc)
+            async with AsyncSessionLocal() as db:
+                batch = (
+                    select(models.Article.id)
+                    .where(due_condition(now))
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                result = await db.execute(
+                    update(models.Article)
+                    .where(models.Article.id.in_(batch.scalar_subquery()))
+                    .values(status=status_expression(now))
+                    .returning(models.Article.id, models.Article.status)
+                    .execution_options(synchronize_session=False)
+                )
+                changes = {id: status for id, status in result.all()}
+                await db.commit()
+
+            if changes:
+                flipped += len(changes)
+                await article_cache.invalidate()
+                await self._announce(changes)
+            if len(changes) < self.batch_size:
+                return flipped
+
+    async def _announce(self, changes: dict[int, str]):
+        try:
+            await publish(STATUS_CHANNEL, json.dumps(changes))
+        except Exception as e:
+            logger.error(f"Failed to publish article status changes: {str(e)}")
+
+
+article_status_scheduler = ArticleStatusScheduler(
+    batch_size=env.ARTICLE_STATUS_BATCH_SIZE
+)
+
+# A write anywhere may have moved the next boundary closer
+subscribe(INVALIDATION_CHANNEL, article_status_scheduler.wake)
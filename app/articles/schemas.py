@@ -4,6 +4,7 @@ from typing import Literal
 from pydantic import BaseModel
 
 Status = Literal["scheduled", "published", "archived"]
+View = Literal["full", "summary"]
 
 
 class ArticleBase(BaseModel):
@@ -27,3 +28,36 @@ class Article(ArticleBase):
 
     class Config:
         from_attributes = True
+
+
+class ArticleSummary(BaseModel):
+    """Article without its content, for list views."""
+
+    id: int
+    title: str
+
+    scheduled_date: datetime | None = None
+    archived_date: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class ArticleSearchResult(ArticleSummary):
+    rank: float
+    # Matching fragments of the content, only with `highlight`
+    highlight: str | None = None
+
+
+class BulkRowError(BaseModel):
+    index: int
+    errors: list[str]
+
+
+class BulkResult(BaseModel):
+    inserted: int
+    failed: int
+    # Capped, `failed` has the full count
+    errors: list[BulkRowError]
+    # Ids of the inserted rows in input order, only with `return_ids`
+    ids: list[int] | None = None
@@ -0,0 +1,65 @@
+from sqlalchemy import func, literal_column, select, tuple_
+
+from app.db import models
+from app.db.models import SEARCH_CONFIG
+
+from .pagination import INVALID_CURSOR_EXCEPTION, decode_cursor
+from .scheduler import status_is
+from .schemas import Status
+
+CURSOR_SCOPE = "search"
+# Inline, so the query matches the generated column's configuration exactly
+CONFIG = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def search_query(
+    q: str, status: Status | None, limit: int, after: str | None, highlight: bool
+):
+    """Ranked matches for `q`, ordered by (rank, id) descending.
+
+    `q` uses web search syntax: quoted phrases, `or` and `-` to exclude.
+    Headlines are computed by an outer query over the limited page only.
+    """
+    tsquery = func.websearch_to_tsquery(CONFIG, q)
+    rank = func.ts_rank(models.Article.search_vector, tsquery)
+
+    columns = [
+        models.Article.id,
+        models.Article.title,
+        models.Article.scheduled_date,
+        models.Article.archived_date,
+        rank.label("rank"),
+    ]
+    if highlight:
+        columns.append(models.Article.content)
+
+    page = (
+        select(*columns)
+        .where(models.Article.search_vector.op("@@")(tsquery))
+        .order_by(rank.desc(), models.Article.id.desc())
+        .limit(limit)
+    )
+    if status is not None:
+        page = page.where(status_is(status))
+
+    if after is not None:
+        last_rank, last_id = decode_cursor(after, CURSOR_SCOPE, 2)
+        if not isinstance(last_rank, (int, float)) or not isinstance(last_id, int):
+            raise INVALID_CURSOR_EXCEPTION
+        page = page.where(tuple_(rank, models.Article.id) < tuple_(last_rank, last_id))
+
+    if not highlight:
+        return page
+
+    page = page.subquery()
+    return select(
+        page.c.id,
+        page.c.title,
+        page.c.scheduled_date,
+        page.c.archived_date,
+        page.c.rank,
+        func.ts_headline(CONFIG, page.c.content, tsquery, HEADLINE_OPTIONS).label(
+            "highlight"
+        ),
+    ).order_by(page.c.rank.desc(), page.c.id.desc())
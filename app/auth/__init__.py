@@ -1,3 +1,5 @@
+import hashlib
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 
@@ -7,13 +9,19 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.schemas import TokenPair
+from app.auth.keys import access_token_keys
+from app.auth.revocation import revocation_registry
+from app.auth.schemas import TokenPair, UserPrincipal
+from app.auth.user_cache import user_cache
+from app.cache import LRUCache
 from app.config import env
 from app.db import get_db, models
+from app.metrics import register_collector
 
+# Refresh tokens are only ever verified by this service, access tokens use
+# `access_token_keys` and may be signed asymmetrically
 ALGORITHM = "HS256"
 
-SECRET_KEY = env.AUTH_SECRET_KEY
 REFRESH_SECRET_KEY = env.AUTH_REFRESH_SECRET_KEY
 
 ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
@@ -25,28 +33,37 @@ CREDENTIALS_EXCEPTION = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
+# Verified access-token claims keyed by a digest of the token, clients resend
+# the same token for its whole lifetime
+access_token_cache = LRUCache(
+    maxsize=env.ACCESS_TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRES.total_seconds()
+)
+register_collector("access_token_cache", access_token_cache.stats)
+
 
 async def create_token_pair(
     user_id: str,
     db: AsyncSession,
     parent_jti: str | None = None,
     token_family: str | None = None,
+    user: UserPrincipal | None = None,
 ):
-    user = await db.execute(select(models.User).where(models.User.id == user_id))
-    user = user.scalar_one_or_none()
-    if not user:
-        raise CREDENTIALS_EXCEPTION
+    if user is None:
+        user = await get_cached_user(user_id, db)
 
     now = datetime.now(timezone.utc)
+    token_family = token_family or str(uuid.uuid4())
+    jti = str(uuid.uuid4())
+
     access_payload = {
         "type": "access",
         "sub": user_id,
         "exp": now + ACCESS_TOKEN_EXPIRES,
+        "family": token_family,
+        "phone_number": user.phone_number,
+        "name": user.name,
     }
 
-    token_family = token_family or str(uuid.uuid4())
-    jti = str(uuid.uuid4())
-
     refresh_payload = {
         "type": "refresh",
         "sub": user_id,
@@ -55,7 +72,7 @@ async def create_token_pair(
         "family": token_family,
     }
 
-    access_token = jwt.encode(access_payload, SECRET_KEY, algorithm=ALGORITHM)
+    access_token = access_token_keys.encode(access_payload)
     refresh_token = jwt.encode(refresh_payload, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
     db_refresh_token = models.RefreshToken(
@@ -78,53 +95,75 @@ async def rotate_refresh_token(refresh_token: str, db: AsyncSession):
     except jwt.InvalidTokenError:
         raise CREDENTIALS_EXCEPTION
 
-    user_id = payload.get("sub")
     jti = payload.get("jti")
     token_family = payload.get("family")
 
-    query = await db.execute(
-        select(models.RefreshToken).where(models.RefreshToken.id == jti)
+    # Revoking and checking in one statement takes the row lock, so of two
+    # concurrent refreshes with the same token only one sees it unrevoked
+    rotated = await db.execute(
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.id == jti,
+            models.RefreshToken.revoked == False,
+            models.RefreshToken.expires_at > datetime.now(timezone.utc),
+            models.RefreshToken.user_id == models.User.id,
+        )
+        .values(revoked=True)
+        .returning(models.User.id, models.User.phone_number, models.User.name)
+        .execution_options(synchronize_session=False)
     )
-    db_token = query.scalar_one_or_none()
-    if not db_token or db_token.revoked:
+    user = rotated.one_or_none()
+    if user is None:
         await db.execute(
             update(models.RefreshToken)
             .where(models.RefreshToken.token_family == token_family)
             .values(revoked=True)
         )
         await db.commit()
+        if token_family:
+            # Also cuts off access tokens already issued to the family
+            await revocation_registry.revoke(token_family, REFRESH_TOKEN_EXPIRES)
         raise CREDENTIALS_EXCEPTION
 
-    await db.execute(
-        update(models.RefreshToken)
-        .where(models.RefreshToken.id == jti)
-        .values(revoked=True)
-    )
-    await db.commit()
-
     token_pair = await create_token_pair(
-        user_id, db, parent_jti=jti, token_family=token_family
+        user.id,
+        db,
+        parent_jti=jti,
+        token_family=token_family,
+        user=UserPrincipal.model_validate(user),
     )
 
     return token_pair
 
 
-async def get_user(
-    credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
-    db: AsyncSession = Depends(get_db),
-):
-    try:
-        payload = jwt.decode(
-            credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM]
-        )
-        user_id = payload.get("sub")
+def decode_access_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = access_token_cache.get(key)
+    if payload is not None and payload["exp"] > time.time():
+        return payload
 
+    try:
+        payload = access_token_keys.decode(token, options={"require": ["exp"]})
     except jwt.InvalidTokenError:
         raise CREDENTIALS_EXCEPTION
 
     if payload.get("type") != "access":
         raise CREDENTIALS_EXCEPTION
 
+    access_token_cache.set(key, payload, ttl=payload["exp"] - time.time())
+    return payload
+
+
+async def verify_access_token(token: str) -> dict:
+    payload = decode_access_token(token)
+
+    if await revocation_registry.is_revoked(payload.get("family")):
+        raise CREDENTIALS_EXCEPTION
+
+    return payload
+
+
+async def load_user(user_id: str, db: AsyncSession) -> models.User:
     user = await db.execute(select(models.User).where(models.User.id == user_id))
     user = user.scalar_one_or_none()
 
@@ -132,3 +171,38 @@ async def get_user(
         raise CREDENTIALS_EXCEPTION
 
     return user
+
+
+async def get_cached_user(user_id: str, db: AsyncSession) -> UserPrincipal:
+    user = user_cache.get(user_id)
+    if user is None:
+        user = UserPrincipal.model_validate(await load_user(user_id, db))
+        user_cache.set(user_id, user)
+
+    return user
+
+
+async def get_db_user(
+    credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    db: AsyncSession = Depends(get_db),
+) -> models.User:
+    """Always load a fresh user row, for endpoints that need current data."""
+    payload = await verify_access_token(credentials.credentials)
+    return await load_user(payload.get("sub"), db)
+
+
+async def get_user(
+    credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    db: AsyncSession = Depends(get_db),
+) -> UserPrincipal:
+    payload = await verify_access_token(credentials.credentials)
+
+    # Tokens issued before identity claims were added still need a lookup
+    if env.AUTH_VERIFY_MODE == "stateless" and "phone_number" in payload:
+        return UserPrincipal(
+            id=payload["sub"],
+            phone_number=payload["phone_number"],
+            name=payload.get("name"),
+        )
+
+    return await get_cached_user(payload.get("sub"), db)
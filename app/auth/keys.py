@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from app.config import env
+
+JWK_ENCODERS = {"ES256": ECAlgorithm, "EdDSA": OKPAlgorithm}
+
+
+class AccessTokenKeys:
+    """Keys used to sign and verify access tokens.
+
+    With HS256 the shared AUTH_SECRET_KEY is used and nothing is published.
+    With ES256 or EdDSA every `<kid>.pem` private key in AUTH_SIGNING_KEYS_DIR
+    is accepted for verification and published in the JWKS, while only
+    AUTH_SIGNING_KEY_ID signs new tokens. Rotate by adding a key, switching the
+    active id, and removing the old key once its tokens have expired.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str,
+        keys_dir: str | None,
+        active_kid: str | None,
+    ):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.active_kid = active_kid
+        self.private_keys = {}
+
+        if algorithm == "HS256":
+            return
+
+        if keys_dir is None or active_kid is None:
+            raise RuntimeError(
+                f"{algorithm} signing needs AUTH_SIGNING_KEYS_DIR and AUTH_SIGNING_KEY_ID"
+            )
+
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            self.private_keys[path.stem] = load_pem_private_key(
+                path.read_bytes(), password=None
+            )
+
+        if active_kid not in self.private_keys:
+            raise RuntimeError(f"Signing key {active_kid} not found in {keys_dir}")
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.algorithm != "HS256"
+
+    def encode(self, payload: dict) -> str:
+        if not self.asymmetric:
+            return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+
+        return jwt.encode(
+            payload,
+            self.private_keys[self.active_kid],
+            algorithm=self.algorithm,
+            headers={"kid": self.active_kid},
+        )
+
+    def decode(self, token: str, **kwargs) -> dict:
+        """Verify a token, raising `jwt.InvalidTokenError` when it is invalid."""
+        if not self.asymmetric:
+            return jwt.decode(
+                token, self.secret_key, algorithms=[self.algorithm], **kwargs
+            )
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid not in self.private_keys:
+            raise jwt.InvalidTokenError("Unknown signing key")
+
+        return jwt.decode(
+            token,
+            self.private_keys[kid].public_key(),
+            algorithms=[self.algorithm],
+            **kwargs,
+        )
+
+    def jwks(self) -> dict:
+        keys = []
+        for kid, private_key in self.private_keys.items():
+            jwk = JWK_ENCODERS[self.algorithm].to_jwk(
+                private_key.public_key(), as_dict=True
+            )
+            keys.append({**jwk, "kid": kid, "alg": self.algorithm, "use": "sig"})
+        return {"keys": keys}
+
+
+access_token_keys = AccessTokenKeys(
+    algorithm=env.AUTH_SIGNING_ALGORITHM,
+    secret_key=env.AUTH_SECRET_KEY,
+    keys_dir=env.AUTH_SIGNING_KEYS_DIR,
+    active_kid=env.AUTH_SIGNING_KEY_ID,
+)
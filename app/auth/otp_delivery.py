@@ -0,0 +1,178 @@
+import asyncio
+import importlib
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+
+from app.config import env
+from app.db.redis_cilent import get_redis
+from app.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+DEAD_LETTER_KEY = "otp:dead_letter"
+DEAD_LETTER_LIMIT = 1000
+BATCH_LINGER_SECONDS = 0.05
+RETRY_BACKOFF_SECONDS = 1.0
+
+
+@dataclass
+class OTPMessage:
+    phone_number: str
+    code: str
+    attempts: int = 0
+
+
+class SMSProvider(ABC):
+    """Interface to an SMS gateway."""
+
+    @abstractmethod
+    async def send_batch(self, messages: list[OTPMessage]) -> list[Exception | None]:
+        """Send messages, returning the error for each one or None on success."""
+
+
+class LoggingSMSProvider(SMSProvider):
+    """Development provider that only logs the codes, at debug level."""
+
+    async def send_batch(self, messages: list[OTPMessage]) -> list[Exception | None]:
+        for message in messages:
+            logger.debug(f"OTP for {message.phone_number}: {message.code}")
+        return [None] * len(messages)
+
+
+def load_provider(path: str) -> SMSProvider:
+    """Instantiate the SMSProvider subclass at a "module.Class" path."""
+    module, _, name = path.rpartition(".")
+    provider = getattr(importlib.import_module(module), name)
+    if not (isinstance(provider, type) and issubclass(provider, SMSProvider)):
+        raise RuntimeError(f"{path} is not an SMSProvider")
+    return provider()
+
+
+class OTPDeliveryQueue:
+    """In-process queue that sends one time codes in batches off the request path.
+
+    Failed messages are retried with exponential backoff and end up in a
+    dead-letter list once `max_retries` is exhausted.
+    """
+
+    def __init__(
+        self,
+        provider: SMSProvider,
+        batch_size: int,
+        concurrency: int,
+        max_retries: int,
+        queue_size: int,
+    ):
+        self.provider = provider
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.queue: asyncio.Queue[OTPMessage] = asyncio.Queue(maxsize=queue_size)
+        self.dead_letters: deque[OTPMessage] = deque(maxlen=DEAD_LETTER_LIMIT)
+        self.stats = {"sent": 0, "retried": 0, "dead": 0}
+        self._workers: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+
+    def enqueue(self, message: OTPMessage) -> bool:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def start(self):
+        self._workers = [
+            asyncio.create_task(self._run()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self, timeout: float = 10):
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Dropping {self.queue.qsize()} undelivered OTP messages")
+
+        for task in [*self._workers, *self._retries]:
+            task.cancel()
+        self._workers = []
+
+    async def _next_batch(self) -> list[OTPMessage]:
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + BATCH_LINGER_SECONDS
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                try:
+                    errors = await self.provider.send_batch(batch)
+                except Exception as e:
+                    errors = [e] * len(batch)
+
+                for message, error in zip(batch, errors):
+                    if error is None:
+                        self.stats["sent"] += 1
+                    else:
+                        await self._retry(message, error)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _retry(self, message: OTPMessage, error: Exception):
+        message.attempts += 1
+        if message.attempts > self.max_retries:
+            await self._dead_letter(message, error)
+            return
+
+        self.stats["retried"] += 1
+        delay = RETRY_BACKOFF_SECONDS * 2 ** (message.attempts - 1)
+        task = asyncio.create_task(self._requeue(message, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, message: OTPMessage, delay: float):
+        await asyncio.sleep(delay)
+        if not self.enqueue(message):
+            await self._dead_letter(message, RuntimeError("Delivery queue is full"))
+
+    async def _dead_letter(self, message: OTPMessage, error: Exception):
+        self.stats["dead"] += 1
+        self.dead_letters.append(message)
+        logger.error(
+            f"Failed to send OTP to {message.phone_number} "
+            f"after {message.attempts} attempts: {str(error)}"
+        )
+
+        # The code itself is never persisted, it is useless once expired
+        try:
+            redis_client = await get_redis()
+            await redis_client.lpush(DEAD_LETTER_KEY, message.phone_number)
+            await redis_client.ltrim(DEAD_LETTER_KEY, 0, DEAD_LETTER_LIMIT - 1)
+        except Exception as e:
+            logger.error(f"Failed to record OTP dead letter: {str(e)}")
+
+
+otp_delivery = OTPDeliveryQueue(
+    load_provider(env.SMS_PROVIDER),
+    batch_size=env.OTP_DELIVERY_BATCH_SIZE,
+    concurrency=env.OTP_DELIVERY_CONCURRENCY,
+    max_retries=env.OTP_DELIVERY_MAX_RETRIES,
+    queue_size=env.OTP_DELIVERY_QUEUE_SIZE,
+)
+
+register_collector(
+    "otp_delivery", lambda: {**otp_delivery.stats, "queued": otp_delivery.queue.qsize()}
+)
@@ -0,0 +1,154 @@
+import secrets
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+import redis.asyncio as redis
+from fastapi import Depends
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import env
+from app.db import get_db, models
+from app.db.redis_cilent import get_redis, register_script, run_script
+
+OTP_EXPIRES = timedelta(minutes=5)
+
+# "invalid" covers both a missing and an expired code
+VerifyResult = Literal["valid", "invalid", "used", "exhausted", "mismatch"]
+
+# Check and consume in one step so concurrent guesses cannot both pass or
+# skip an attempt increment
+VERIFY_OTP_SCRIPT = """
+local otp = redis.call("HMGET", KEYS[1], "code", "attempts", "used")
+if not otp[1] then
+    return {"invalid", 0}
+end
+if otp[3] == "1" then
+    return {"used", 0}
+end
+
+local attempts = tonumber(otp[2])
+if attempts >= tonumber(ARGV[2]) then
+    return {"exhausted", attempts}
+end
+if otp[1] ~= ARGV[1] then
+    return {"mismatch", redis.call("HINCRBY", KEYS[1], "attempts", 1)}
+end
+
+redis.call("HSET", KEYS[1], "used", "1")
+return {"valid", attempts}
+"""
+
+register_script("verify_otp", VERIFY_OTP_SCRIPT)
+
+
+class OTPStore(ABC):
+    """Storage for hashed one time codes."""
+
+    @abstractmethod
+    async def save(self, phone_number: str, code_hash: str):
+        pass
+
+    @abstractmethod
+    async def verify(
+        self, phone_number: str, code_hash: str, max_attempts: int
+    ) -> tuple[VerifyResult, int]:
+        """Check a code, counting failed attempts and consuming it on success.
+
+        Returns the result and the number of failed attempts so far.
+        """
+
+
+class DatabaseOTPStore(OTPStore):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save(self, phone_number: str, code_hash: str):
+        expires_at = datetime.now(timezone.utc) + OTP_EXPIRES
+        await self.db.execute(
+            insert(models.OneTimeCode)
+            .values(
+                phone_number=phone_number,
+                code=code_hash,
+                expires_at=expires_at,
+                attempts=0,
+                used=False,
+            )
+            .on_conflict_do_update(
+                index_elements=["phone_number"],
+                set_=dict(
+                    code=code_hash, attempts=0, used=False, expires_at=expires_at
+                ),
+            )
+        )
+        await self.db.commit()
+
+    async def verify(
+        self, phone_number: str, code_hash: str, max_attempts: int
+    ) -> tuple[VerifyResult, int]:
+        db_code = (
+            await self.db.execute(
+                select(models.OneTimeCode).where(
+                    models.OneTimeCode.phone_number == phone_number
+                )
+            )
+        ).scalar_one_or_none()
+
+        if db_code is None or db_code.expires_at <= datetime.now(timezone.utc):
+            return "invalid", 0
+
+        if db_code.used:
+            return "used", db_code.attempts
+
+        if db_code.attempts >= max_attempts:
+            return "exhausted", db_code.attempts
+
+        if not secrets.compare_digest(code_hash, db_code.code):
+            await self.db.execute(
+                update(models.OneTimeCode)
+                .where(models.OneTimeCode.phone_number == phone_number)
+                .values(attempts=models.OneTimeCode.attempts + 1)
+            )
+            await self.db.commit()
+            return "mismatch", db_code.attempts + 1
+
+        # Committed together with the user and token writes of the caller
+        await self.db.execute(
+            update(models.OneTimeCode)
+            .where(models.OneTimeCode.phone_number == phone_number)
+            .values(used=True)
+        )
+        return "valid", db_code.attempts
+
+
+class RedisOTPStore(OTPStore):
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    @staticmethod
+    def _key(phone_number: str) -> str:
+        return f"otp:{phone_number}"
+
+    async def save(self, phone_number: str, code_hash: str):
+        key = self._key(phone_number)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={"code": code_hash, "attempts": 0, "used": 0})
+            pipe.expire(key, OTP_EXPIRES)
+            await pipe.execute()
+
+    async def verify(
+        self, phone_number: str, code_hash: str, max_attempts: int
+    ) -> tuple[VerifyResult, int]:
+        result, attempts = await run_script(
+            "verify_otp", [self._key(phone_number)], [code_hash, max_attempts]
+        )
+        return result, int(attempts)
+
+
+async def get_otp_store(db: AsyncSession = Depends(get_db)) -> OTPStore:
+    if env.OTP_STORE == "redis":
+        return RedisOTPStore(await get_redis())
+    return DatabaseOTPStore(db)
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from app.bloom import BloomFilter
+from app.config import env
+from app.db.redis_cilent import get_redis, publish, subscribe
+from app.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of revoked token families scored by their expiry timestamp
+REVOKED_FAMILIES_KEY = "revoked_families"
+REVOCATION_CHANNEL = "revoked_families:added"
+
+BLOOM_ERROR_RATE = 0.001
+REBUILD_INTERVAL_SECONDS = 300
+
+
+class RevocationRegistry:
+    """Revoked refresh-token families, shared through Redis.
+
+    Each worker mirrors the set into a Bloom filter, so checking a token that
+    was never revoked needs no network call. Only Bloom hits are confirmed
+    against Redis. The filter is rebuilt periodically to forget expired
+    entries, and new revocations from other workers arrive over pub/sub.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.bloom = BloomFilter(capacity, BLOOM_ERROR_RATE)
+        self.stats = {"checks": 0, "bloom_hits": 0, "revoked": 0}
+        self._task: asyncio.Task | None = None
+        # Families revoked while a rebuild is reading Redis
+        self._added_during_rebuild: set[str] | None = None
+
+    async def start(self):
+        await self.rebuild()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(REBUILD_INTERVAL_SECONDS)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Failed to rebuild revocation filter: {str(e)}")
+
+    async def rebuild(self):
+        redis_client = await get_redis()
+        now = time.time()
+        self._added_during_rebuild = set()
+        try:
+            await redis_client.zremrangebyscore(REVOKED_FAMILIES_KEY, "-inf", now)
+            families = await redis_client.zrangebyscore(
+                REVOKED_FAMILIES_KEY, now, "+inf"
+            )
+
+            bloom = BloomFilter(self.capacity, BLOOM_ERROR_RATE)
+            for family in [*families, *self._added_during_rebuild]:
+                bloom.add(family)
+            self.bloom = bloom
+        finally:
+            self._added_during_rebuild = None
+
+    async def revoke(self, family: str, ttl: timedelta):
+        redis_client = await get_redis()
+        expires_at = time.time() + ttl.total_seconds()
+        await redis_client.zadd(REVOKED_FAMILIES_KEY, {family: expires_at})
+        self._add(family)
+        await publish(REVOCATION_CHANNEL, family)
+
+    async def is_revoked(self, family: str | None) -> bool:
+        self.stats["checks"] += 1
+        if family is None or family not in self.bloom:
+            return False
+
+        self.stats["bloom_hits"] += 1
+        redis_client = await get_redis()
+        expires_at = await redis_client.zscore(REVOKED_FAMILIES_KEY, family)
+        revoked = expires_at is not None and expires_at > time.time()
+        if revoked:
+            self.stats["revoked"] += 1
+        return revoked
+
+    def _add(self, family: str):
+        self.bloom.add(family)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.add(family)
+
+    def _on_revoked(self, family: str):
+        self._add(family)
+
+
+revocation_registry = RevocationRegistry(capacity=env.REVOCATION_BLOOM_CAPACITY)
+
+subscribe(REVOCATION_CHANNEL, revocation_registry._on_revoked)
+register_collector("revocation", lambda: dict(revocation_registry.stats))
@@ -2,35 +2,56 @@ import hashlib
 import logging
 import secrets
 import uuid
-from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import select, update
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import rate_limiter
 from app.auth import create_token_pair, get_user, rotate_refresh_token
+from app.auth.keys import access_token_keys
+from app.auth.otp_delivery import OTPMessage, otp_delivery
+from app.auth.otp_store import OTPStore, get_otp_store
 from app.auth.schemas import (
     OneTimeCodeInput,
     RefreshTokenSchema,
     TokenPair,
+    UserPrincipal,
     VerifyCodeInput,
 )
+from app.auth.user_cache import invalidate_user
 from app.db import get_db, models
+from app.rate_limiter import RateLimit, RateLimitedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=RateLimitedRoute)
+well_known_router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
 OTP_LENGTH = 6
 MAX_OTP_ATTEMPTS = 5
 
-
-async def send_otp(phone_number: str, code: str):
-    # TODO: Send OTP to user
-    print(phone_number, code)
-    pass
+REQUEST_OTP_LIMITS = [
+    Depends(RateLimit("request-otp", max_requests=5, timeframe_seconds=10)),
+    Depends(
+        RateLimit(
+            "request-otp:phone",
+            max_requests=3,
+            timeframe_seconds=300,
+            identity="phone",
+        )
+    ),
+]
+VERIFY_OTP_LIMITS = [
+    Depends(RateLimit("verify-otp", max_requests=5, timeframe_seconds=10)),
+    Depends(
+        RateLimit(
+            "verify-otp:phone",
+            max_requests=10,
+            timeframe_seconds=300,
+            identity="phone",
+        )
+    ),
+]
 
 
 def random_otp() -> str:
@@ -41,63 +62,36 @@ def hash_otp(otp: str) -> str:
     return hashlib.sha256(otp.encode()).hexdigest()
 
 
-@router.post("/request-otp")
+@router.post("/request-otp", dependencies=REQUEST_OTP_LIMITS)
 async def request_otp(
-    request: Request, otp_input: OneTimeCodeInput, db: AsyncSession = Depends(get_db)
+    otp_input: OneTimeCodeInput, otp_store: OTPStore = Depends(get_otp_store)
 ):
-    await rate_limiter.rate_limit(request, max_requests=5, timeframe_seconds=10)
     otp = random_otp()
 
-    db_code = await db.execute(
-        insert(models.OneTimeCode)
-        .values(
-            phone_number=otp_input.phone_number,
-            code=hash_otp(otp),
-            expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
-            attempts=0,
-            used=False,
-        )
-        .on_conflict_do_update(
-            index_elements=["phone_number"],
-            set_=dict(
-                code=hash_otp(otp),
-                attempts=0,
-                used=False,
-                expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
-            ),
-        )
-        .returning(models.OneTimeCode)
-    )
-    db_code = db_code.scalar_one()
+    await otp_store.save(otp_input.phone_number, hash_otp(otp))
 
-    try:
-        await send_otp(otp_input.phone_number, otp)
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Failed to send OTP to {otp_input.phone_number}: {str(e)}")
+    # Delivery happens in the background, the request does not wait on the
+    # SMS provider
+    if not otp_delivery.enqueue(OTPMessage(otp_input.phone_number, otp)):
+        logger.error(f"OTP delivery queue is full, dropping {otp_input.phone_number}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not send one time code",
         )
 
-    await db.commit()
-
 
-@router.post("/token")
+@router.post("/token", dependencies=VERIFY_OTP_LIMITS)
 async def verify_otp(
-    request, otp_input: VerifyCodeInput, db: AsyncSession = Depends(get_db)
+    otp_input: VerifyCodeInput,
+    db: AsyncSession = Depends(get_db),
+    otp_store: OTPStore = Depends(get_otp_store),
 ) -> TokenPair:
-    await rate_limiter.rate_limit(request, max_requests=5, timeframe_seconds=10)
-    db_code = (
-        await db.execute(
-            select(models.OneTimeCode).where(
-                models.OneTimeCode.phone_number == otp_input.phone_number
-            )
-        )
-    ).scalar_one_or_none()
+    result, attempts = await otp_store.verify(
+        otp_input.phone_number, hash_otp(otp_input.code), MAX_OTP_ATTEMPTS
+    )
 
     # Check if code exists and is not expired
-    if db_code is None or db_code.expires_at <= datetime.now(timezone.utc):
+    if result == "invalid":
         logger.warning(
             f"Invalid or expired OTP attempt for phone: {otp_input.phone_number}"
         )
@@ -106,46 +100,29 @@ async def verify_otp(
         )
 
     # Check if code has already been used
-    if db_code.used:
+    if result == "used":
         logger.warning(f"Attempted reuse of OTP for phone: {otp_input.phone_number}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Code is invalid"
         )
 
     # Check if max attempts exceeded
-    if db_code.attempts >= MAX_OTP_ATTEMPTS:
+    if result == "exhausted":
         logger.warning(f"Max OTP attempts exceeded for phone: {otp_input.phone_number}")
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many failed attempts. Please request a new code.",
         )
 
-    # Verify the code
-    codes_match = secrets.compare_digest(hash_otp(otp_input.code), db_code.code)
-
-    if not codes_match:
-        # Increment attempts on failed verification
-        await db.execute(
-            update(models.OneTimeCode)
-            .where(models.OneTimeCode.phone_number == otp_input.phone_number)
-            .values(attempts=db_code.attempts + 1)
-        )
-        await db.commit()
+    if result == "mismatch":
         logger.warning(
-            f"Failed OTP verification attempt {db_code.attempts + 1}/{MAX_OTP_ATTEMPTS} "
+            f"Failed OTP verification attempt {attempts}/{MAX_OTP_ATTEMPTS} "
             f"for phone: {otp_input.phone_number}"
         )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Code is invalid"
         )
 
-    # Mark code as used
-    await db.execute(
-        update(models.OneTimeCode)
-        .where(models.OneTimeCode.phone_number == otp_input.phone_number)
-        .values(used=True)
-    )
-
     # Create or update user
     user = (
         await db.execute(
@@ -163,15 +140,17 @@ async def verify_otp(
         )
     ).scalar_one()
 
-    token_pair = await create_token_pair(user.id, db)
-    await db.commit()
+    token_pair = await create_token_pair(
+        user.id, db, user=UserPrincipal.model_validate(user)
+    )
+    await invalidate_user(user.id)
 
     logger.info(f"Successful OTP verification for phone: {otp_input.phone_number}")
     return token_pair
 
 
-@router.get("/token/verify")
-async def get_current_user(current_user: models.User = Depends(get_user)):
+@router.get("/token/verify", response_model=UserPrincipal)
+async def get_current_user(current_user: UserPrincipal = Depends(get_user)):
     return current_user
 
 
@@ -181,3 +160,9 @@ async def refresh_token(
 ) -> TokenPair:
     token_pair = await rotate_refresh_token(refresh_input.refresh_token, db)
     return token_pair
+
+
+@well_known_router.get("/jwks.json")
+async def get_jwks(response: Response):
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return access_token_keys.jwks()
@@ -33,3 +33,12 @@ class AccessTokenSchema(BaseModel):
 
 class TokenPair(RefreshTokenSchema, AccessTokenSchema):
     pass
+
+
+class UserPrincipal(BaseModel):
+    id: str
+    phone_number: str
+    name: str | None = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,134 @@
+"""Convert refresh_tokens to and from a table partitioned by expiry month.
+
+Optional and separate from the Alembic history, so it can be applied to or
+reverted from a database at any migration revision:
+
+    python -m app.auth.token_partitions partition
+    python -m app.auth.token_partitions unpartition
+
+Once partitioned, the refresh token sweeper creates upcoming monthly
+partitions and drops expired ones instead of deleting rows. Postgres requires
+unique constraints on a partitioned table to include the partition key, so
+the primary key becomes (id, expires_at) and the parent_token_id self
+reference is no longer enforced by a foreign key. Each command runs in a
+single transaction and locks the table while rows are copied.
+"""
+
+import asyncio
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.auth.token_sweeper import PARTITION_PREFIX, PARTITIONS_AHEAD
+from app.db import engine
+
+COLUMNS = "id, user_id, token_family, parent_token_id, revoked, created_at, expires_at"
+
+INDEXES = [
+    "CREATE INDEX ix_refresh_tokens_token_family ON refresh_tokens (token_family)",
+    "CREATE INDEX ix_refresh_tokens_user_id ON refresh_tokens (user_id)",
+    "CREATE INDEX ix_refresh_tokens_expires_at ON refresh_tokens (expires_at)",
+]
+
+PARTITION = [
+    """
+    CREATE TABLE refresh_tokens_partitioned (
+        id VARCHAR NOT NULL,
+        user_id VARCHAR NOT NULL REFERENCES users (id),
+        token_family VARCHAR NOT NULL,
+        parent_token_id VARCHAR,
+        revoked BOOLEAN NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id, expires_at)
+    ) PARTITION BY RANGE (expires_at)
+    """,
+    "CREATE TABLE refresh_tokens_default "
+    "PARTITION OF refresh_tokens_partitioned DEFAULT",
+    # Partition bounds are whole months in UTC, matching the sweeper
+    "SET LOCAL timezone = 'UTC'",
+    f"""
+    DO $$
+    DECLARE
+        month DATE := date_trunc(
+            'month', coalesce((SELECT min(expires_at) FROM refresh_tokens), now())
+        );
+    BEGIN
+        WHILE month <= date_trunc('month', now()) + interval '{PARTITIONS_AHEAD} months' LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF refresh_tokens_partitioned '
+                'FOR VALUES FROM (%L) TO (%L)',
+                '{PARTITION_PREFIX}' || to_char(month, 'YYYYMM'),
+                month,
+                month + interval '1 month'
+            );
+            month := month + interval '1 month';
+        END LOOP;
+    END $$
+    """,
+    f"INSERT INTO refresh_tokens_partitioned SELECT {COLUMNS} FROM refresh_tokens",
+    "DROP TABLE refresh_tokens",
+    "ALTER TABLE refresh_tokens_partitioned RENAME TO refresh_tokens",
+    "CREATE INDEX ix_refresh_tokens_id ON refresh_tokens (id)",
+    *INDEXES,
+]
+
+UNPARTITION = [
+    "ALTER TABLE refresh_tokens RENAME TO refresh_tokens_partitioned",
+    """
+    CREATE TABLE refresh_tokens (
+        id VARCHAR NOT NULL,
+        user_id VARCHAR NOT NULL REFERENCES users (id),
+        token_family VARCHAR NOT NULL,
+        parent_token_id VARCHAR,
+        revoked BOOLEAN NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id, user_id, token_family)
+    )
+    """,
+    f"INSERT INTO refresh_tokens SELECT {COLUMNS} FROM refresh_tokens_partitioned",
+    "DROP TABLE refresh_tokens_partitioned",
+    # Parents may already be dropped with their partition
+    "UPDATE refresh_tokens SET parent_token_id = NULL "
+    "WHERE parent_token_id NOT IN (SELECT id FROM refresh_tokens)",
+    "CREATE UNIQUE INDEX ix_refresh_tokens_id ON refresh_tokens (id)",
+    *INDEXES,
+    "ALTER TABLE refresh_tokens ADD CONSTRAINT refresh_tokens_parent_token_id_fkey "
+    "FOREIGN KEY (parent_token_id) REFERENCES refresh_tokens (id) "
+    "ON DELETE SET NULL",
+]
+
+
+async def is_partitioned(connection: AsyncConnection) -> bool:
+    result = await connection.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = 'refresh_tokens'::regclass)"
+        )
+    )
+    return result.scalar_one()
+
+
+async def convert(partition: bool):
+    async with engine.begin() as connection:
+        if await is_partitioned(connection) == partition:
+            state = "already" if partition else "not"
+            print(f"refresh_tokens is {state} partitioned, nothing to do")
+            return
+
+        # Keeps writers out while rows are copied
+        await connection.execute(
+            text("LOCK TABLE refresh_tokens IN ACCESS EXCLUSIVE MODE")
+        )
+        for statement in PARTITION if partition else UNPARTITION:
+            await connection.execute(text(statement))
+
+    print(f"refresh_tokens {'partitioned' if partition else 'unpartitioned'}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in ("partition", "unpartition"):
+        sys.exit(f"Usage: python -m {__spec__.name} partition|unpartition")
+    asyncio.run(convert(sys.argv[1] == "partition"))
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import env
+from app.db import AsyncSessionLocal, models
+
+logger = logging.getLogger(__name__)
+
+# Rotated tokens are only needed for reuse detection, which also works from
+# the family id in the token once the row is gone
+REVOKED_TOKEN_RETENTION = timedelta(days=1)
+
+PARTITION_PREFIX = "refresh_tokens_p"
+PARTITIONS_AHEAD = 2
+PARTITION_LOCK_ID = 0x5245_4652  # Arbitrary advisory lock key
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    year, index = divmod(month.month - 1 + months, 12)
+    return month.replace(year=month.year + year, month=index + 1)
+
+
+class RefreshTokenSweeper:
+    """Background job deleting expired and long-revoked refresh tokens.
+
+    Rows are deleted in bounded batches with a pause in between, so the job
+    never holds many locks or saturates the database. When the table has been
+    partitioned by expires_at (`python -m app.auth.token_partitions partition`),
+    whole expired partitions are dropped instead and upcoming ones are created
+    ahead of time.
+    """
+
+    def __init__(self, interval: float, batch_size: int, pause: float):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                deleted = await self.sweep()
+                logger.info(f"Swept {deleted} refresh tokens")
+            except Exception as e:
+                # Includes connection errors asyncpg raises unwrapped
+                logger.error(f"Refresh token sweep failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        async with AsyncSessionLocal() as db:
+            if await self._is_partitioned(db):
+                await self._maintain_partitions(db)
+
+        deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                batch = await self._delete_batch(db)
+            deleted += batch
+            if batch < self.batch_size:
+                return deleted
+            await asyncio.sleep(self.pause)
+
+    async def _delete_batch(self, db: AsyncSession) -> int:
+        now = datetime.now(timezone.utc)
+        batch = (
+            select(models.RefreshToken.id)
+            .where(
+                or_(
+                    models.RefreshToken.expires_at <= now,
+                    and_(
+                        models.RefreshToken.revoked == True,
+                        models.RefreshToken.created_at <= now - REVOKED_TOKEN_RETENTION,
+                    ),
+                )
+            )
+            .limit(self.batch_size)
+            # Lets several workers sweep side by side without waiting
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            delete(models.RefreshToken)
+            .where(models.RefreshToken.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def _is_partitioned(self, db: AsyncSession) -> bool:
+        result = await db.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = 'refresh_tokens'::regclass)"
+            )
+        )
+        return result.scalar_one()
+
+    async def _maintain_partitions(self, db: AsyncSession):
+        locked = await db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": PARTITION_LOCK_ID}
+        )
+        if not locked.scalar_one():
+            return
+
+        partitions = await db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'refresh_tokens'::regclass"
+            )
+        )
+        existing = set(partitions.scalars())
+
+        now = datetime.now(timezone.utc)
+        this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        for offset in range(PARTITIONS_AHEAD + 1):
+            month = _add_months(this_month, offset)
+            name = f"{PARTITION_PREFIX}{month:%Y%m}"
+            if name not in existing:
+                await db.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF refresh_tokens "
+                        f"FOR VALUES FROM ('{month.isoformat()}') "
+                        f"TO ('{_add_months(month, 1).isoformat()}')"
+                    )
+                )
+
+        for name in existing:
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            month = datetime.strptime(name[len(PARTITION_PREFIX) :], "%Y%m")
+            if _add_months(month.replace(tzinfo=timezone.utc), 1) <= now:
+                await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                logger.info(f"Dropped expired refresh token partition {name}")
+
+        await db.commit()
+
+
+refresh_token_sweeper = RefreshTokenSweeper(
+    interval=env.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS,
+    batch_size=env.REFRESH_TOKEN_SWEEP_BATCH_SIZE,
+    pause=env.REFRESH_TOKEN_SWEEP_PAUSE_SECONDS,
+)
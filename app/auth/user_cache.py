@@ -0,0 +1,18 @@
+from app.cache import LRUCache
+from app.config import env
+from app.db.redis_cilent import publish, subscribe
+from app.metrics import register_collector
+
+INVALIDATION_CHANNEL = "user_cache:invalidate"
+
+user_cache = LRUCache(maxsize=env.USER_CACHE_SIZE, ttl=env.USER_CACHE_TTL_SECONDS)
+
+
+async def invalidate_user(user_id: str):
+    """Drop a user from this worker's cache and tell the other workers to."""
+    user_cache.delete(user_id)
+    await publish(INVALIDATION_CHANNEL, user_id)
+
+
+subscribe(INVALIDATION_CHANNEL, user_cache.delete)
+register_collector("user_cache", user_cache.stats)
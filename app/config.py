@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,11 +8,74 @@ load_dotenv()
 
 class EnvironmentVariables(BaseSettings):
     DEBUG: bool = False
+    # Bearer token required by /metrics, which is only served without one
+    # when DEBUG is set
+    METRICS_TOKEN: str | None = None
     DATABASE_URL: str
     AUTH_SECRET_KEY: str
     AUTH_REFRESH_SECRET_KEY: str
     REDIS_URL: str
 
+    # Optional read replicas for GET endpoints
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_EJECT_SECONDS: float = 30
+    DB_READ_YOUR_WRITES_SECONDS: float = 5
+
+    # Pool settings are per worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # Disables prepared statement caching for PgBouncer in transaction mode
+    DB_PGBOUNCER: bool = False
+
+    # ES256 or EdDSA let other services verify access tokens with the JWKS
+    AUTH_SIGNING_ALGORITHM: Literal["HS256", "ES256", "EdDSA"] = "HS256"
+    AUTH_SIGNING_KEYS_DIR: str | None = None
+    AUTH_SIGNING_KEY_ID: str | None = None
+
+    # "database" loads the user row through the user cache, so changes show
+    # within USER_CACHE_TTL_SECONDS; "stateless" trusts the identity claims
+    # signed into the access token
+    AUTH_VERIFY_MODE: Literal["database", "stateless"] = "database"
+
+    OTP_STORE: Literal["database", "redis"] = "database"
+    # SMSProvider subclass sending one time codes, as "module.Class"
+    SMS_PROVIDER: str = "app.auth.otp_delivery.LoggingSMSProvider"
+    OTP_DELIVERY_BATCH_SIZE: int = 50
+    OTP_DELIVERY_CONCURRENCY: int = 4
+    OTP_DELIVERY_MAX_RETRIES: int = 3
+    OTP_DELIVERY_QUEUE_SIZE: int = 10_000
+
+    # Expected number of revoked token families alive at once
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: float = 3600
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = 1000
+    REFRESH_TOKEN_SWEEP_PAUSE_SECONDS: float = 0.1
+
+    ACCESS_TOKEN_CACHE_SIZE: int = 50_000
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60
+    ARTICLE_CACHE_TTL_SECONDS: float = 300
+    ARTICLE_CACHE_L1_SIZE: int = 1000
+    ARTICLE_CACHE_L1_TTL_SECONDS: float = 1
+    # Coalesce misses across workers with a Redis lock, 0 disables it
+    ARTICLE_CACHE_LOCK_TIMEOUT_SECONDS: float = 0
+    ARTICLE_STATUS_BATCH_SIZE: int = 500
+    # Rows per COPY or INSERT; INSERT binds 5 parameters per row, at most 32767
+    ARTICLE_BULK_CHUNK_SIZE: int = 1000
+    ARTICLE_EXPORT_BATCH_SIZE: int = 1000
+
+    # Requests leased from Redis per round trip; 1 keeps the limiter exact
+    RATE_LIMIT_LOCAL_BATCH: int = 1
+    RATE_LIMIT_LOCAL_KEYS: int = 100_000
+    # Proxies allowed to set X-Forwarded-For, as IPs or CIDR ranges
+    TRUSTED_PROXIES: list[str] = []
+
     model_config = SettingsConfigDict(env_file=".env", extra="allow")
 
 
@@ -1,18 +1,150 @@
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from fastapi import Request
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import env
+from app.metrics import register_collector
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    checkouts = 0
+    total_wait = 0.0
+    max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+
+def create_engine(url: str):
+    connect_args = {
+        "statement_cache_size": env.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": env.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+    if env.DB_PGBOUNCER:
+        # PgBouncer in transaction mode may hand each transaction a different
+        # server connection, so named prepared statements cannot be reused
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=env.DB_POOL_SIZE,
+        max_overflow=env.DB_MAX_OVERFLOW,
+        pool_timeout=env.DB_POOL_TIMEOUT,
+        pool_recycle=env.DB_POOL_RECYCLE,
+        pool_pre_ping=env.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+class ReleasingSession(AsyncSession):
+    """Session that returns its connection to the pool right after each read.
+
+    A plain SELECT issued outside a transaction, with nothing pending to
+    flush, is committed as soon as its rows are buffered, so the connection
+    is not held while the handler runs other code or renders the response.
+    Anything else opens a transaction that lasts until the caller commits.
+    """
+
+    def _can_release(self) -> bool:
+        return not self.in_transaction() and not (
+            self.new or self.dirty or self.deleted
+        )
+
+    async def _release(self):
+        # Skips subclass commit hooks, nothing was written
+        await super().commit()
+
+    async def execute(self, statement, *args, **kwargs):
+        release = (
+            self._can_release()
+            and isinstance(statement, Select)
+            and statement._for_update_arg is None
+        )
+        result = await super().execute(statement, *args, **kwargs)
+        if release:
+            await self._release()
+        return result
 
-engine = create_async_engine(env.DATABASE_URL)
+    async def scalar(self, statement, *args, **kwargs):
+        return (await self.execute(statement, *args, **kwargs)).scalar()
+
+    async def get(self, *args, **kwargs):
+        release = self._can_release() and not kwargs.get("with_for_update")
+        instance = await super().get(*args, **kwargs)
+        if release and self.in_transaction():
+            await self._release()
+        return instance
+
+    async def refresh(self, *args, **kwargs):
+        release = self._can_release() and not kwargs.get("with_for_update")
+        await super().refresh(*args, **kwargs)
+        if release and self.in_transaction():
+            await self._release()
+
+
+# Called with the originating request after a request-scoped session commits
+on_commit_hooks: list[Callable[[Request], Awaitable[None]]] = []
+
+
+class RequestSession(ReleasingSession):
+    async def commit(self):
+        await super().commit()
+        request = self.info.get("request")
+        if request is not None:
+            for hook in on_commit_hooks:
+                await hook(request)
+
+
+engine = create_engine(env.DATABASE_URL)
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
+RequestSessionLocal = async_sessionmaker(
+    engine, class_=RequestSession, expire_on_commit=False
+)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
+async def get_db(request: Request):
+    # No connection is checked out until the handler runs its first statement
+    async with RequestSessionLocal() as session:
+        session.info["request"] = request
         yield session
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": pool.checkouts,
+        "avg_wait": pool.total_wait / pool.checkouts if pool.checkouts else 0,
+        "max_wait": pool.max_wait,
+    }
+
+
+register_collector("db_pool", lambda: pool_stats(engine))
@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import Computed, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db import Base
@@ -32,15 +33,42 @@ class RefreshToken(Base):
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
     token_family: Mapped[str] = mapped_column(index=True)
     parent_token_id: Mapped[Optional[str]] = mapped_column(
-        ForeignKey("refresh_tokens.id"), nullable=True
+        ForeignKey("refresh_tokens.id", ondelete="SET NULL"), nullable=True
     )
     revoked: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+# Text search configuration of the article search vector
+SEARCH_CONFIG = "english"
 
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        # Listing indexes, one per status, ordered like the keyset cursor
+        Index(
+            "ix_articles_scheduled",
+            "scheduled_date",
+            "id",
+            postgresql_where="status = 'scheduled'",
+        ),
+        Index("ix_articles_published", "id", postgresql_where="status = 'published'"),
+        Index(
+            "ix_articles_archived",
+            "archived_date",
+            "id",
+            postgresql_where="status = 'archived'",
+        ),
+        # Lets the status scheduler find the next article to archive
+        Index(
+            "ix_articles_pending_archive",
+            "archived_date",
+            postgresql_where="status <> 'archived' AND archived_date IS NOT NULL",
+        ),
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column()
@@ -52,3 +80,15 @@ class Article(Base):
     archived_date: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Derived from the dates, kept current by the article status scheduler
+    status: Mapped[str] = mapped_column(server_default="published")
+    # Title matches rank above content matches, deferred as it is only searched
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
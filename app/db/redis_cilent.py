@@ -1,9 +1,22 @@
+import asyncio
+import logging
+from typing import Callable
+
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError, RedisError
 
 from app.config import env
 
+logger = logging.getLogger(__name__)
+
 redis_client: redis.Redis | None = None
 
+subscriptions: dict[str, list[Callable[[str], None]]] = {}
+subscriber_task: asyncio.Task | None = None
+
+scripts: dict[str, str] = {}
+script_shas: dict[str, str] = {}
+
 
 async def get_redis() -> redis.Redis:
     """Get Redis client instance."""
@@ -12,19 +25,75 @@ async def get_redis() -> redis.Redis:
     return redis_client
 
 
+def subscribe(channel: str, handler: Callable[[str], None]):
+    """Register a handler for messages on a pub/sub channel.
+
+    Handlers must be registered before `init_redis` starts the subscriber.
+    """
+    subscriptions.setdefault(channel, []).append(handler)
+
+
+async def publish(channel: str, message: str):
+    client = await get_redis()
+    await client.publish(channel, message)
+
+
+def register_script(name: str, source: str):
+    """Register a Lua script to be loaded into Redis by `init_redis`."""
+    scripts[name] = source
+
+
+async def run_script(name: str, keys: list[str], args: list):
+    """Run a registered script with EVALSHA, reloading it if Redis lost it."""
+    client = await get_redis()
+    try:
+        return await client.evalsha(script_shas[name], len(keys), *keys, *args)
+    except (KeyError, NoScriptError):
+        script_shas[name] = await client.script_load(scripts[name])
+        return await client.evalsha(script_shas[name], len(keys), *keys, *args)
+
+
+async def _listen():
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(*subscriptions)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    for handler in subscriptions.get(message["channel"], []):
+                        try:
+                            handler(message["data"])
+                        except Exception as e:
+                            # One bad message must not stop the other channels
+                            logger.error(
+                                f"Handler for {message['channel']} failed: {str(e)}"
+                            )
+        except RedisError as e:
+            logger.error(f"Redis subscriber disconnected: {str(e)}")
+            await asyncio.sleep(1)
+
+
 async def init_redis():
     """Initialize Redis connection pool."""
-    global redis_client
+    global redis_client, subscriber_task
     redis_client = await redis.from_url(
         env.REDIS_URL,
         encoding="utf-8",
         decode_responses=True,
     )
+    for name, source in scripts.items():
+        script_shas[name] = await redis_client.script_load(source)
+    if subscriptions:
+        subscriber_task = asyncio.create_task(_listen())
 
 
 async def close_redis():
     """Close Redis connection."""
-    global redis_client
+    global redis_client, subscriber_task
+    if subscriber_task:
+        subscriber_task.cancel()
+        subscriber_task = None
     if redis_client:
         await redis_client.close()
         redis_client = None
@@ -0,0 +1,143 @@
+import hashlib
+import itertools
+import logging
+import time
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import env
+from app.db import (
+    ReleasingSession,
+    RequestSessionLocal,
+    create_engine,
+    on_commit_hooks,
+    pool_stats,
+)
+from app.db.redis_cilent import get_redis
+from app.metrics import register_collector
+from app.net import client_ip
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Read replicas picked round-robin, skipping recently failed ones."""
+
+    def __init__(self, urls: list[str], eject_seconds: float):
+        self.urls = urls
+        self.eject_seconds = eject_seconds
+        self.engines = [create_engine(url) for url in urls]
+        self.sessionmakers = [
+            async_sessionmaker(engine, class_=ReleasingSession, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self.ejected_until = [0.0] * len(self.engines)
+        self._counter = itertools.count()
+
+        for index, engine in enumerate(self.engines):
+            event.listen(engine.sync_engine, "handle_error", self._error_handler(index))
+
+    def _error_handler(self, index: int):
+        def handle_error(context):
+            if context.is_disconnect:
+                self.eject(index, context.original_exception)
+
+        return handle_error
+
+    def eject(self, index: int, error: Exception):
+        self.ejected_until[index] = time.monotonic() + self.eject_seconds
+        logger.error(f"Ejecting read replica {index}: {str(error)}")
+
+    def choose(self) -> int | None:
+        now = time.monotonic()
+        for _ in range(len(self.sessionmakers)):
+            index = next(self._counter) % len(self.sessionmakers)
+            if self.ejected_until[index] <= now:
+                return index
+        return None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            str(index): {
+                "healthy": self.ejected_until[index] <= now,
+                **pool_stats(engine),
+            }
+            for index, engine in enumerate(self.engines)
+        }
+
+
+replica_set = ReplicaSet(env.DATABASE_REPLICA_URLS, env.DB_REPLICA_EJECT_SECONDS)
+
+
+def _recent_write_key(request: Request) -> str:
+    authorization = request.headers.get("Authorization")
+    if authorization:
+        identity = hashlib.sha256(authorization.encode()).hexdigest()
+    else:
+        identity = client_ip(request)
+    return f"recent_write:{identity}"
+
+
+async def mark_recent_write(request: Request):
+    try:
+        redis_client = await get_redis()
+        await redis_client.set(
+            _recent_write_key(request),
+            1,
+            px=int(env.DB_READ_YOUR_WRITES_SECONDS * 1000),
+        )
+    except Exception as e:
+        logger.error(f"Failed to record recent write: {str(e)}")
+
+
+async def _wrote_recently(request: Request) -> bool:
+    try:
+        redis_client = await get_redis()
+        return bool(await redis_client.exists(_recent_write_key(request)))
+    except Exception:
+        # Reading from the primary is always safe
+        return True
+
+
+async def get_read_db(request: Request):
+    """Session for read-only work, served by a replica when one is usable.
+
+    Falls back to the primary when no replica is configured or healthy, and
+    for clients that wrote within DB_READ_YOUR_WRITES_SECONDS.
+    """
+    index = None
+    if replica_set.engines and not await _wrote_recently(request):
+        index = replica_set.choose()
+
+    if index is None:
+        async with RequestSessionLocal() as session:
+            yield session
+        return
+
+    async with replica_set.sessionmakers[index]() as session:
+        session.info["replica"] = index
+        try:
+            yield session
+        except OSError as e:
+            # asyncpg raises connection failures unwrapped, bypassing handle_error
+            replica_set.eject(index, e)
+            raise
+
+
+def max_staleness(session: AsyncSession) -> float | None:
+    """How far reads in `session` may lag behind writes, None on the primary.
+
+    Replica lag is assumed to stay under DB_READ_YOUR_WRITES_SECONDS, anything
+    cached from a replica read should not outlive that.
+    """
+    if "replica" in session.info:
+        return env.DB_READ_YOUR_WRITES_SECONDS
+    return None
+
+
+if replica_set.engines:
+    on_commit_hooks.append(mark_recent_write)
+    register_collector("db_replicas", replica_set.stats)
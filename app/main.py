@@ -4,6 +4,11 @@ from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.articles.scheduler import article_status_scheduler
+from app.auth.otp_delivery import otp_delivery
+from app.auth.revocation import revocation_registry
+from app.auth.router import well_known_router
+from app.auth.token_sweeper import refresh_token_sweeper
 from app.db.redis_cilent import close_redis, init_redis
 from app.router import router
 
@@ -12,8 +17,16 @@ from app.router import router
 async def lifespan(app: FastAPI):
     print("Startup")
     await init_redis()
+    await revocation_registry.start()
+    await otp_delivery.start()
+    await refresh_token_sweeper.start()
+    await article_status_scheduler.start()
     yield
     print("Shutdown")
+    await article_status_scheduler.stop()
+    await refresh_token_sweeper.stop()
+    await otp_delivery.stop()
+    await revocation_registry.stop()
     await close_redis()
 
 
@@ -30,3 +43,4 @@ async def sqlalchemy_exception_handler(_request: Request, exc: SQLAlchemyError):
 
 
 app.include_router(router, prefix="/api")
+app.include_router(well_known_router, prefix="/.well-known", tags=["Auth"])
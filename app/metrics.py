@@ -0,0 +1,38 @@
+import secrets
+from typing import Callable
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.config import env
+
+collectors: dict[str, Callable[[], dict]] = {}
+
+
+def register_collector(name: str, collector: Callable[[], dict]):
+    collectors[name] = collector
+
+
+async def verify_metrics_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(
+        HTTPBearer(auto_error=False)
+    ),
+):
+    if env.METRICS_TOKEN is None:
+        return
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials, env.METRICS_TOKEN
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(verify_metrics_token)])
+
+
+@router.get("/")
+async def get_metrics():
+    return {name: collector() for name, collector in collectors.items()}
@@ -0,0 +1,35 @@
+import ipaddress
+
+from fastapi import Request
+
+from app.config import env
+
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network, strict=False) for network in env.TRUSTED_PROXIES
+]
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str:
+    """Client address, following X-Forwarded-For only through trusted proxies."""
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+
+    forwarded = [
+        hop.strip()
+        for hop in request.headers.get("X-Forwarded-For", "").split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(forwarded):
+        if not _is_trusted_proxy(hop):
+            return hop
+
+    return forwarded[0] if forwarded else peer
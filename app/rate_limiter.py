@@ -1,34 +1,266 @@
-from fastapi import HTTPException, Request, status
+import math
+import time
+from dataclasses import dataclass
+from typing import Literal
 
-from app.db.redis_cilent import get_redis
+import phonenumbers
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
 
+from app.auth import decode_access_token
+from app.cache import LRUCache
+from app.config import env
+from app.db.redis_cilent import register_script, run_script
+from app.metrics import register_collector
+from app.net import client_ip
 
-async def rate_limit(
-    request: Request,
-    max_requests: int = 100,
-    timeframe_seconds: int = 60,
-    key_prefix: str = "rate_limit",
-):
-    client_id = (
-        request.client.host
-        if request.client
-        else request.headers.get("X-Forwarded-For", "unknown")
+# Generic cell rate algorithm: the key holds the theoretical arrival time of
+# the next request, so the check and the update are one atomic round trip.
+# ARGV[3] leases up to that many requests at once for the local pre-filter.
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local interval = period / limit
+
+local tat = tonumber(redis.call("GET", KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local available = math.floor((now + period - tat) / interval + 1e-9)
+if available < 1 then
+    return {0, 0, tostring(tat - now), tostring(tat + interval - period - now)}
+end
+
+local granted = math.min(requested, available)
+local new_tat = tat + granted * interval
+redis.call("SET", KEYS[1], tostring(new_tat), "PX", math.ceil((new_tat - now) * 1000))
+return {granted, available - granted, tostring(new_tat - now), "0"}
+"""
+
+register_script("gcra", GCRA_SCRIPT)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+@dataclass
+class LocalBucket:
+    """Requests leased from the shared Redis limit, or a cached rejection."""
+
+    tokens: int
+    remaining: int
+    reset_at: float
+    retry_at: float
+
+
+# Per-worker pre-filter in front of Redis. Leased tokens are already counted
+# in Redis and expire once the limit would have refilled them, so the shared
+# limit holds; a larger RATE_LIMIT_LOCAL_BATCH only trades exactness of the
+# remaining quota across workers for fewer Redis calls.
+local_buckets = LRUCache(maxsize=env.RATE_LIMIT_LOCAL_KEYS, ttl=float("inf"))
+local_stats = {"local": 0, "redis": 0}
+
+
+def _local_check(key: str, max_requests: int) -> RateLimitResult | None:
+    bucket: LocalBucket | None = local_buckets.get(key)
+    if bucket is None:
+        return None
+
+    now = time.monotonic()
+    local_stats["local"] += 1
+
+    if bucket.tokens == 0:
+        return RateLimitResult(
+            allowed=False,
+            limit=max_requests,
+            remaining=0,
+            reset_after=bucket.reset_at - now,
+            retry_after=bucket.retry_at - now,
+        )
+
+    bucket.tokens -= 1
+    if bucket.tokens == 0:
+        local_buckets.delete(key)
+
+    return RateLimitResult(
+        allowed=True,
+        limit=max_requests,
+        remaining=bucket.remaining + bucket.tokens,
+        reset_after=bucket.reset_at - now,
+        retry_after=0,
+    )
+
+
+async def _redis_check(
+    key: str, max_requests: int, timeframe_seconds: int
+) -> RateLimitResult:
+    lease = max(1, min(env.RATE_LIMIT_LOCAL_BATCH, max_requests))
+
+    granted, remaining, reset_after, retry_after = await run_script(
+        "gcra", [key], [max_requests, timeframe_seconds, lease]
     )
+    granted, remaining = int(granted), int(remaining)
+    reset_after, retry_after = float(reset_after), float(retry_after)
 
-    key = f"{key_prefix}:{client_id}"
+    local_stats["redis"] += 1
+    now = time.monotonic()
 
-    redis_client = await get_redis()
+    if granted == 0:
+        bucket = LocalBucket(0, 0, now + reset_after, now + retry_after)
+        local_buckets.set(key, bucket, ttl=retry_after)
+    elif granted > 1:
+        # Redis advanced the limit by one interval per granted token; spending
+        # leftovers after that would exceed the limit
+        bucket = LocalBucket(granted - 1, remaining, now + reset_after, now)
+        local_buckets.set(key, bucket, ttl=granted * timeframe_seconds / max_requests)
+
+    return RateLimitResult(
+        allowed=granted > 0,
+        limit=max_requests,
+        remaining=remaining + max(granted - 1, 0),
+        reset_after=reset_after,
+        retry_after=retry_after,
+    )
 
-    current = await redis_client.get(key)
 
-    if current is None:
-        await redis_client.setex(key, timeframe_seconds, 1)
-        return
+async def check_limit(
+    key: str, max_requests: int, timeframe_seconds: int
+) -> RateLimitResult:
+    result = _local_check(key, max_requests)
+    if result is None:
+        result = await _redis_check(key, max_requests, timeframe_seconds)
 
-    if int(current) >= max_requests:
+    if not result.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many requests. Please try again later.",
+            headers=result.headers(),
         )
 
-    await redis_client.incr(key)
+    return result
+
+
+Identity = Literal["ip", "user", "phone"]
+
+
+class RateLimit:
+    """Rate-limit policy used as a route dependency.
+
+    On routes using `RateLimitedRoute`, "ip" and "user" policies are checked
+    before the request body is read and before any other dependency, such as
+    the DB session, is solved. "phone" policies need the body, so they run as
+    regular dependencies, still ahead of the endpoint's own parameters.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_requests: int,
+        timeframe_seconds: int,
+        identity: Identity = "ip",
+    ):
+        self.name = name
+        self.max_requests = max_requests
+        self.timeframe_seconds = timeframe_seconds
+        self.identity = identity
+
+    @property
+    def needs_body(self) -> bool:
+        return self.identity == "phone"
+
+    async def identify(self, request: Request) -> str | None:
+        if self.identity == "user":
+            scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    return f"user:{decode_access_token(token)['sub']}"
+                except HTTPException:
+                    pass
+            return f"ip:{client_ip(request)}"
+
+        if self.identity == "phone":
+            try:
+                body = await request.json()
+                phone_number = body["phone_number"]
+                parsed = phonenumbers.parse(phone_number, None)
+                return phonenumbers.format_number(
+                    parsed, phonenumbers.PhoneNumberFormat.E164
+                )
+            except (ValueError, KeyError, TypeError, phonenumbers.NumberParseException):
+                # Malformed bodies are rejected by request validation
+                return None
+
+        return client_ip(request)
+
+    async def enforce(self, request: Request) -> RateLimitResult | None:
+        results = request.scope.setdefault("rate_limit_results", {})
+        if self in results:
+            return results[self]
+
+        identity = await self.identify(request)
+        result = None
+        if identity is not None:
+            key = f"rate_limit:{self.name}:{identity}"
+            result = await check_limit(key, self.max_requests, self.timeframe_seconds)
+
+        results[self] = result
+        return result
+
+    async def __call__(self, request: Request, response: Response):
+        await self.enforce(request)
+        # Report the policy closest to rejecting when several apply
+        results = [
+            result
+            for result in request.scope["rate_limit_results"].values()
+            if result is not None
+        ]
+        if results:
+            strictest = min(
+                results, key=lambda result: (result.remaining, -result.reset_after)
+            )
+            response.headers.update(strictest.headers())
+
+
+class RateLimitedRoute(APIRoute):
+    """Route class that enforces body-independent `RateLimit` policies first."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        limits = [
+            depends.dependency
+            for depends in self.dependencies
+            if isinstance(depends.dependency, RateLimit)
+            and not depends.dependency.needs_body
+        ]
+        if not limits:
+            return handler
+
+        async def rate_limited_handler(request: Request) -> Response:
+            for limit in limits:
+                await limit.enforce(request)
+            return await handler(request)
+
+        return rate_limited_handler
+
+
+register_collector("rate_limiter", lambda: {**local_stats, **local_buckets.stats()})
@@ -2,8 +2,13 @@ from fastapi import APIRouter
 
 from app.articles.router import router as articles_router
 from app.auth.router import router as auth_router
+from app.config import env
+from app.metrics import router as metrics_router
 
 router = APIRouter()
 
 router.include_router(auth_router, prefix="/auth", tags=["Auth"])
 router.include_router(articles_router, prefix="/articles", tags=["Articles"])
+
+if env.DEBUG or env.METRICS_TOKEN:
+    router.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
@@ -0,0 +1,97 @@
+"""Throughput and memory benchmark of the streaming article export.
+
+Seeds articles into TEST_DATABASE_URL, which should point at a disposable
+database, then drains `stream_articles` in each format and reports rows per
+second and the peak Python memory allocated while streaming:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.export --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+# The export reads through the app's own engine, from the seeded primary
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/benchmark")
+os.environ.setdefault("AUTH_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("AUTH_REFRESH_SECRET_KEY", "benchmark-refresh-secret")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+
+from sqlalchemy import text  # noqa: E402
+
+from app.articles.export import stream_articles  # noqa: E402
+from app.db import engine, models  # noqa: E402
+
+TITLE_PREFIX = "export-benchmark "
+
+SEED = f"""
+INSERT INTO articles (title, content, scheduled_date, archived_date, status)
+SELECT
+    '{TITLE_PREFIX}' || i,
+    repeat('Lorem ipsum dolor sit amet. ', 20),
+    now() - interval '1 day',
+    CASE WHEN i % 10 = 0 THEN now() - interval '1 hour' END,
+    CASE WHEN i % 10 = 0 THEN 'archived' ELSE 'published' END
+FROM generate_series(1, :rows) AS i
+"""
+
+
+async def drain(format: str, batch_size: int) -> tuple[int, int]:
+    """Rows and bytes produced by one full export."""
+    rows = size = 0
+    async for chunk in stream_articles(format, None, batch_size):
+        rows += chunk.count("\n")
+        size += len(chunk)
+    if format == "csv":
+        rows -= 1  # Header
+    return rows, size
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if not os.environ.get("TEST_DATABASE_URL"):
+        sys.exit("Set TEST_DATABASE_URL to a disposable Postgres database")
+
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            models.Base.metadata.create_all, tables=[models.Article.__table__]
+        )
+        await connection.execute(text(SEED), {"rows": args.rows})
+
+    try:
+        for format in ("ndjson", "csv"):
+            start = time.perf_counter()
+            rows, size = await drain(format, args.batch_size)
+            elapsed = time.perf_counter() - start
+
+            # Tracing slows allocation down, so memory is measured separately
+            tracemalloc.start()
+            await drain(format, args.batch_size)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"{format:6}: {rows} rows, {size / 2**20:.0f} MiB in {elapsed:.1f}s, "
+                f"{rows / elapsed:,.0f} rows/s, peak {peak / 2**20:.1f} MiB"
+            )
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(
+                text("DELETE FROM articles WHERE title LIKE :prefix"),
+                {"prefix": f"{TITLE_PREFIX}%"},
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
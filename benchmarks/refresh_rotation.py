@@ -0,0 +1,102 @@
+"""Benchmark of refresh token rotation against a real Postgres database.
+
+Rotates one token family repeatedly, as a client refreshing its session
+would, and reports per-refresh latency and database round trips. Uses
+TEST_DATABASE_URL, which should point at a disposable database:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.refresh_rotation
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Settings needed to import the app; nothing connects at import time
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/benchmark")
+os.environ.setdefault("AUTH_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("AUTH_REFRESH_SECRET_KEY", "benchmark-refresh-secret")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+
+from sqlalchemy import delete, event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+
+from app.auth import create_token_pair, rotate_refresh_token  # noqa: E402
+from app.auth.schemas import UserPrincipal  # noqa: E402
+from app.db import create_engine, models  # noqa: E402
+
+
+class RoundTrips:
+    """Counts statements and transaction control sent to the database."""
+
+    def __init__(self, engine):
+        self.count = 0
+        for name in ("begin", "commit", "rollback", "before_cursor_execute"):
+            event.listen(engine.sync_engine, name, self._record)
+
+    def _record(self, *args, **kwargs):
+        self.count += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshes", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        sys.exit("Set TEST_DATABASE_URL to a disposable Postgres database")
+
+    engine = create_engine(url)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            models.Base.metadata.create_all,
+            tables=[models.User.__table__, models.RefreshToken.__table__],
+        )
+
+    user_id = str(uuid.uuid4())
+    user = UserPrincipal(id=user_id, phone_number=f"+1555{user_id[:8]}", name=None)
+    async with sessionmaker() as db:
+        db.add(models.User(id=user_id, phone_number=user.phone_number))
+        await db.commit()
+        refresh_token = (await create_token_pair(user_id, db, user=user)).refresh_token
+
+    round_trips = RoundTrips(engine)
+    latencies = []
+    try:
+        for index in range(args.warmup + args.refreshes):
+            if index == args.warmup:
+                round_trips.count = 0
+            start = time.perf_counter()
+            async with sessionmaker() as db:
+                pair = await rotate_refresh_token(refresh_token, db)
+            if index >= args.warmup:
+                latencies.append(time.perf_counter() - start)
+            refresh_token = pair.refresh_token
+    finally:
+        async with sessionmaker() as db:
+            await db.execute(
+                delete(models.RefreshToken).where(
+                    models.RefreshToken.user_id == user_id
+                )
+            )
+            await db.execute(delete(models.User).where(models.User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{args.refreshes} refreshes after {args.warmup} warm-up")
+    print(
+        f"latency: p50 {quantiles[49] * 1e3:.2f} ms, p95 {quantiles[94] * 1e3:.2f} ms, "
+        f"p99 {quantiles[98] * 1e3:.2f} ms"
+    )
+    print(f"round trips: {round_trips.count / args.refreshes:.1f} per refresh")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""Micro-benchmark of decode_access_token with and without the token cache.
+
+Requests draw from a pool of live tokens with Zipf-distributed reuse, as
+active clients resend the same access token until it expires:
+
+    python -m benchmarks.token_cache --tokens 10000 --requests 200000
+"""
+
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Settings needed to import the app; nothing connects at import time
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/benchmark")
+os.environ.setdefault("AUTH_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("AUTH_REFRESH_SECRET_KEY", "benchmark-refresh-secret")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+
+import app.auth  # noqa: E402
+from app.auth import ACCESS_TOKEN_EXPIRES, decode_access_token  # noqa: E402
+from app.auth.keys import access_token_keys  # noqa: E402
+from app.cache import LRUCache  # noqa: E402
+from app.config import env  # noqa: E402
+
+
+def make_tokens(count: int) -> list[str]:
+    expires = datetime.now(timezone.utc) + ACCESS_TOKEN_EXPIRES
+    return [
+        access_token_keys.encode(
+            {
+                "type": "access",
+                "sub": str(uuid.uuid4()),
+                "exp": expires,
+                "family": str(uuid.uuid4()),
+                "phone_number": "+15555550100",
+                "name": "Benchmark",
+            }
+        )
+        for _ in range(count)
+    ]
+
+
+def run(requests: list[str], cache: LRUCache) -> float:
+    """Seconds per decode with `cache` installed as the token cache."""
+    app.auth.access_token_cache = cache
+    start = time.perf_counter()
+    for token in requests:
+        decode_access_token(token)
+    return (time.perf_counter() - start) / len(requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tokens = make_tokens(args.tokens)
+    weights = [1 / rank**args.skew for rank in range(1, len(tokens) + 1)]
+    requests = rng.choices(tokens, weights, k=args.requests)
+
+    # A zero-size cache stores nothing, so every call is a full decode
+    uncached = run(requests, LRUCache(maxsize=0, ttl=1))
+    cache = LRUCache(
+        maxsize=env.ACCESS_TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRES.total_seconds()
+    )
+    cached = run(requests, cache)
+
+    stats = cache.stats()
+    print(
+        f"{env.AUTH_SIGNING_ALGORITHM} tokens, {args.tokens} live, {args.requests} requests"
+    )
+    print(f"uncached: {uncached * 1e6:7.2f} us/decode")
+    print(
+        f"cached:   {cached * 1e6:7.2f} us/decode "
+        f"({stats['hits'] / (stats['hits'] + stats['misses']):.1%} hits)"
+    )
+    print(f"speedup:  {uncached / cached:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.articles.cache import ArticleCache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = ArticleCache(ttl=10, l1_size=10, l1_ttl=1)
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return "value", None
+
+    results = await asyncio.gather(*(cache.fetch(None, "k", load) for _ in range(10)))
+
+    assert results == ["value"] * 10
+    assert loads == 1
+    assert cache._inflight == {}
+
+
+async def test_waiters_elect_one_new_leader_when_leader_is_cancelled():
+    cache = ArticleCache(ttl=10, l1_size=10, l1_ttl=1)
+    loads = 0
+    started = asyncio.Event()
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        started.set()
+        await asyncio.sleep(0.05)
+        return "value", None
+
+    leader = asyncio.create_task(cache.fetch(None, "k", load))
+    await started.wait()
+    waiters = [asyncio.create_task(cache.fetch(None, "k", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert results == ["value"] * 3
+    assert loads == 2
+    assert cache._inflight == {}
+
+
+async def test_load_errors_are_shared():
+    cache = ArticleCache(ttl=10, l1_size=10, l1_ttl=1)
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise LookupError("missing")
+
+    results = await asyncio.gather(
+        *(cache.fetch(None, "k", load) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert cache._inflight == {}
+
+
+async def test_fills_honour_a_shorter_ttl(fake_redis):
+    cache = ArticleCache(ttl=300, l1_size=10, l1_ttl=1)
+
+    async def load():
+        return "value", 5
+
+    await cache.fetch(0, "item:1", load)
+    await cache.set_many(0, {"item:2": "value"}, 5)
+    await cache.set_many(0, {"item:3": "value"})
+
+    assert 0 < await fake_redis.pttl("articles:v0:item:1") <= 5000
+    assert 0 < await fake_redis.pttl("articles:v0:item:2") <= 5000
+    assert await fake_redis.pttl("articles:v0:item:3") > 5000
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.articles import scheduler
+from app.auth import token_sweeper
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_status_scheduler_survives_connection_errors(monkeypatch):
+    monkeypatch.setattr(scheduler, "ERROR_RETRY_SECONDS", 0.01)
+    job = scheduler.ArticleStatusScheduler(batch_size=10)
+    calls = 0
+    recovered = asyncio.Event()
+
+    async def flip_due():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionRefusedError("Connect call failed")
+        recovered.set()
+        return 0
+
+    async def next_boundary():
+        return None
+
+    monkeypatch.setattr(job, "flip_due", flip_due)
+    monkeypatch.setattr(job, "next_boundary", next_boundary)
+
+    await job.start()
+    try:
+        await asyncio.wait_for(recovered.wait(), 1)
+    finally:
+        await job.stop()
+
+
+async def test_refresh_token_sweeper_survives_connection_errors(monkeypatch):
+    job = token_sweeper.RefreshTokenSweeper(interval=0.01, batch_size=10, pause=0)
+    calls = 0
+    recovered = asyncio.Event()
+
+    async def sweep():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionRefusedError("Connect call failed")
+        recovered.set()
+        return 0
+
+    monkeypatch.setattr(job, "sweep", sweep)
+
+    await job.start()
+    try:
+        await asyncio.wait_for(recovered.wait(), 1)
+    finally:
+        await job.stop()
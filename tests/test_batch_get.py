@@ -0,0 +1,92 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.articles import router
+from app.articles.router import MAX_BATCH_IDS, load_by_ids, parse_ids
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCache:
+    def __init__(self, entries: dict[str, str]):
+        self.entries = entries
+        self.stored: dict[str, str] = {}
+
+    async def version(self):
+        return 1
+
+    async def get_many(self, version, keys):
+        return {key: self.entries[key] for key in keys if key in self.entries}
+
+    async def set_many(self, version, values, ttl=None):
+        self.stored.update(values)
+
+
+class FakeSession:
+    def __init__(self, articles: list[int]):
+        self.articles = articles
+        self.info = {}
+        self.queried: list[list[int]] = []
+
+    async def execute(self, query):
+        ids = query.compile().params["ids"]
+        self.queried.append(ids)
+        rows = [
+            SimpleNamespace(id=id, title=f"Article {id}", content="", **DATES)
+            for id in ids
+            if id in self.articles
+        ]
+        return SimpleNamespace(scalars=lambda: rows)
+
+
+DATES = {"scheduled_date": None, "archived_date": None}
+
+
+def cached(id: int) -> str:
+    return json.dumps({"id": id, "title": "cached", "content": "", **DATES})
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = FakeCache({"item:2": cached(2)})
+    monkeypatch.setattr(router, "article_cache", cache)
+    return cache
+
+
+def test_parse_ids():
+    assert parse_ids("3, 1,2,") == [3, 1, 2]
+    assert parse_ids(",".join(["7"] * MAX_BATCH_IDS)) == [7] * MAX_BATCH_IDS
+
+
+@pytest.mark.parametrize(
+    "ids", ["", " , ", "1,a", "1.5", ",".join(["1"] * (MAX_BATCH_IDS + 1))]
+)
+def test_parse_ids_rejects(ids):
+    with pytest.raises(HTTPException) as raised:
+        parse_ids(ids)
+    assert raised.value.status_code == 400
+
+
+async def test_results_follow_the_requested_order(cache):
+    db = FakeSession(articles=[1, 3, 4])
+
+    body = json.loads(await load_by_ids(db, [4, 2, 1, 5, 4]))
+
+    assert [article and article["id"] for article in body] == [4, 2, 1, None, 4]
+    assert body[1]["title"] == "cached"
+    # Cached and duplicate ids are queried once, misses stay uncached
+    assert db.queried == [[4, 1, 5]]
+    assert set(cache.stored) == {"item:4", "item:1"}
+
+
+async def test_fully_cached_requests_skip_the_database(cache):
+    db = FakeSession(articles=[])
+
+    assert json.loads(await load_by_ids(db, [2, 2])) == [
+        json.loads(cached(2)),
+        json.loads(cached(2)),
+    ]
+    assert db.queried == []
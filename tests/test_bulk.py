@@ -0,0 +1,94 @@
+import pytest
+
+from app.articles import bulk
+from app.articles.bulk import BulkIngest, ParseError, RowTooLarge
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def collect(rows) -> list:
+    return [row async for row in rows]
+
+
+async def test_ndjson_skips_oversized_rows(monkeypatch):
+    monkeypatch.setattr(bulk, "MAX_ROW_BYTES", 16)
+    data = b'{"a": 1}\n"' + b"x" * 40 + b'"\n{"a": 2}\n'
+
+    rows = await collect(bulk.iter_ndjson(chunked(data, 4)))
+
+    assert rows[0] == {"a": 1}
+    assert isinstance(rows[1], RowTooLarge)
+    assert rows[2:] == [{"a": 2}]
+
+
+async def test_ndjson_reports_invalid_lines():
+    rows = await collect(bulk.iter_ndjson(chunked(b'{"a": 1}\nnope\n\n[]', 3)))
+
+    assert rows[0] == {"a": 1}
+    assert isinstance(rows[1], ParseError)
+    assert rows[2:] == [[]]
+
+
+async def test_json_array_streams_elements():
+    data = b'[{"a": 1}, {"b": "\xc3\xa9"}, 3]'
+
+    assert await collect(bulk.iter_json_array(chunked(data, 5))) == [
+        {"a": 1},
+        {"b": "é"},
+        3,
+    ]
+
+
+async def test_json_array_ends_at_oversized_element(monkeypatch):
+    monkeypatch.setattr(bulk, "MAX_ROW_BYTES", 16)
+    data = b'[{"a": 1}, "' + b"x" * 40 + b'", {"a": 2}]'
+
+    rows = await collect(bulk.iter_json_array(chunked(data, 4)))
+
+    assert rows[0] == {"a": 1}
+    assert isinstance(rows[1], RowTooLarge)
+    assert len(rows) == 2
+
+
+async def test_oversized_rows_are_row_errors(monkeypatch):
+    monkeypatch.setattr(bulk, "MAX_ROW_BYTES", 16)
+    data = b'"' + b"x" * 40 + b'"\n{}\n'
+
+    result = await BulkIngest(None, 10, False).run(bulk.iter_ndjson(chunked(data, 8)))
+
+    assert result.inserted == 0
+    assert result.failed == 2
+    assert result.errors[0].index == 0
+    assert "smaller than 16 bytes" in result.errors[0].errors[0]
+    assert result.errors[1].index == 1
+
+
+async def test_json_array_rejects_trailing_data():
+    rows = await collect(bulk.iter_json_array(chunked(b'[{"a": 1}] \n', 3)))
+    assert rows == [{"a": 1}]
+
+    rows = await collect(bulk.iter_json_array(chunked(b'[{"a": 1}]  junk', 3)))
+    assert rows[0] == {"a": 1}
+    assert isinstance(rows[1], ParseError)
+    assert len(rows) == 2
+
+
+async def test_json_array_does_not_buffer_after_the_end():
+    consumed = 0
+
+    async def chunks():
+        nonlocal consumed
+        yield b'[{"a": 1}]'
+        for _ in range(1000):
+            consumed += 1
+            yield b"junk" * 1024
+
+    rows = await collect(bulk.iter_json_array(chunks()))
+
+    assert isinstance(rows[-1], ParseError)
+    assert consumed == 1
@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.articles.pagination import encode_cursor
+from app.articles.router import page_query
+from app.db import models
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(
+        not os.environ.get("TEST_DATABASE_URL"),
+        reason="set TEST_DATABASE_URL to a disposable Postgres database",
+    ),
+]
+
+SEED = """
+INSERT INTO articles (title, content, scheduled_date, archived_date, status)
+SELECT
+    'Article ' || i,
+    'Content',
+    CASE WHEN i % 3 = 0 THEN now() + interval '1 day' * i END,
+    CASE WHEN i % 3 = 1 THEN now() - interval '1 minute' * i END,
+    CASE i % 3 WHEN 0 THEN 'scheduled' WHEN 1 THEN 'archived' ELSE 'published' END
+FROM generate_series(1, 30000) AS i
+"""
+
+CURSORS = {
+    "scheduled": (datetime(2030, 1, 1, tzinfo=timezone.utc), 1),
+    "published": (100,),
+    "archived": (datetime(2020, 1, 1, tzinfo=timezone.utc), 1),
+}
+
+
+@pytest.fixture
+async def connection():
+    engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        await connection.run_sync(
+            models.Base.metadata.create_all, tables=[models.Article.__table__]
+        )
+        await connection.execute(text(SEED))
+        await connection.execute(text("ANALYZE articles"))
+        yield connection
+        # Everything above, the table included, is rolled back
+        await transaction.rollback()
+    await engine.dispose()
+
+
+async def explain(connection, query) -> str:
+    sql = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.execute(text(f"EXPLAIN {sql}"))
+    return "\n".join(result.scalars())
+
+
+@pytest.mark.parametrize("status", ["scheduled", "published", "archived"])
+@pytest.mark.parametrize("view", ["full", "summary"])
+@pytest.mark.parametrize("paged", [False, True])
+async def test_listing_uses_the_status_index(connection, status, view, paged):
+    after = encode_cursor(status, CURSORS[status]) if paged else None
+
+    plan = await explain(connection, page_query(status, view, 20, after, None))
+
+    assert f"ix_articles_{status} " in plan, plan
+    assert "Sort" not in plan, plan
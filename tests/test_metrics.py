@@ -0,0 +1,34 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.config import env
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(metrics, "collectors", {"test": lambda: {"hits": 1}})
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/metrics")
+    return TestClient(app)
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(env, "METRICS_TOKEN", "secret")
+
+    assert client.get("/metrics/").status_code == 401
+    assert (
+        client.get("/metrics/", headers={"Authorization": "Bearer wrong"}).status_code
+        == 401
+    )
+
+    response = client.get("/metrics/", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert response.json() == {"test": {"hits": 1}}
+
+
+def test_metrics_are_open_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(env, "METRICS_TOKEN", None)
+
+    assert client.get("/metrics/").json() == {"test": {"hits": 1}}
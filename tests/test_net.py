@@ -0,0 +1,30 @@
+import ipaddress
+
+import pytest
+from fastapi import Request
+
+from app import net
+from app.net import client_ip
+
+
+def request(peer: str, forwarded: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "client": (peer, 1234), "headers": headers})
+
+
+@pytest.fixture(autouse=True)
+def trusted_proxies(monkeypatch):
+    monkeypatch.setattr(net, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+
+
+def test_untrusted_peer_cannot_forward():
+    assert client_ip(request("203.0.113.5", "198.51.100.1")) == "203.0.113.5"
+
+
+def test_trusted_proxies_are_skipped():
+    forwarded = "198.51.100.1, 192.0.2.7, 10.0.0.2"
+    assert client_ip(request("10.0.0.1", forwarded)) == "192.0.2.7"
+
+
+def test_trusted_peer_without_header():
+    assert client_ip(request("10.0.0.1")) == "10.0.0.1"
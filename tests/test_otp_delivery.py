@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.auth import otp_delivery
+from app.auth.otp_delivery import (
+    DEAD_LETTER_KEY,
+    LoggingSMSProvider,
+    OTPDeliveryQueue,
+    OTPMessage,
+    SMSProvider,
+    load_provider,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSMSProvider(SMSProvider):
+    def __init__(self, failures: dict[str, int] | None = None):
+        # Attempts to fail per phone number, -1 fails forever
+        self.failures = failures or {}
+        self.batches: list[list[str]] = []
+
+    async def send_batch(self, messages: list[OTPMessage]) -> list[Exception | None]:
+        self.batches.append([message.phone_number for message in messages])
+        errors = []
+        for message in messages:
+            remaining = self.failures.get(message.phone_number, 0)
+            if remaining:
+                self.failures[message.phone_number] = remaining - 1
+                errors.append(RuntimeError("gateway unavailable"))
+            else:
+                errors.append(None)
+        return errors
+
+
+class BrokenSMSProvider(SMSProvider):
+    async def send_batch(self, messages: list[OTPMessage]) -> list[Exception | None]:
+        raise ConnectionError("gateway down")
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(otp_delivery, "RETRY_BACKOFF_SECONDS", 0.01)
+
+
+def make_queue(provider: SMSProvider, **kwargs) -> OTPDeliveryQueue:
+    options = dict(batch_size=3, concurrency=1, max_retries=2, queue_size=100)
+    return OTPDeliveryQueue(provider, **{**options, **kwargs})
+
+
+async def wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def enqueue(queue: OTPDeliveryQueue, *phone_numbers: str):
+    for phone_number in phone_numbers:
+        assert queue.enqueue(OTPMessage(phone_number, "123456"))
+
+
+async def test_messages_are_sent_in_batches():
+    provider = FakeSMSProvider()
+    queue = make_queue(provider)
+    enqueue(queue, "1", "2", "3", "4", "5")
+
+    await queue.start()
+    await queue.stop()
+
+    assert provider.batches == [["1", "2", "3"], ["4", "5"]]
+    assert queue.stats == {"sent": 5, "retried": 0, "dead": 0}
+
+
+async def test_failed_messages_are_retried_with_backoff():
+    provider = FakeSMSProvider(failures={"2": 2})
+    queue = make_queue(provider)
+    enqueue(queue, "1", "2")
+
+    await queue.start()
+    await wait_for(lambda: queue.stats["sent"] == 2)
+    await queue.stop()
+
+    assert provider.batches == [["1", "2"], ["2"], ["2"]]
+    assert queue.stats == {"sent": 2, "retried": 2, "dead": 0}
+
+
+async def test_exhausted_messages_are_dead_lettered(fake_redis):
+    provider = FakeSMSProvider(failures={"2": -1})
+    queue = make_queue(provider)
+    enqueue(queue, "1", "2")
+
+    await queue.start()
+    await wait_for(lambda: queue.stats["dead"] == 1)
+    await queue.stop()
+
+    assert provider.batches.count(["2"]) == 2
+    assert queue.stats == {"sent": 1, "retried": 2, "dead": 1}
+    assert [message.phone_number for message in queue.dead_letters] == ["2"]
+    assert await fake_redis.lrange(DEAD_LETTER_KEY, 0, -1) == ["2"]
+
+
+async def test_provider_exceptions_fail_the_whole_batch(fake_redis):
+    queue = make_queue(BrokenSMSProvider(), max_retries=0)
+    enqueue(queue, "1", "2")
+
+    await queue.start()
+    await queue.stop()
+
+    assert queue.stats == {"sent": 0, "retried": 0, "dead": 2}
+
+
+async def test_enqueue_reports_a_full_queue():
+    queue = make_queue(FakeSMSProvider(), queue_size=1)
+
+    assert queue.enqueue(OTPMessage("1", "123456"))
+    assert not queue.enqueue(OTPMessage("2", "123456"))
+
+
+def test_load_provider():
+    assert isinstance(
+        load_provider("app.auth.otp_delivery.LoggingSMSProvider"), LoggingSMSProvider
+    )
+    with pytest.raises(RuntimeError):
+        load_provider("app.cache.LRUCache")
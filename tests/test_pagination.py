@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.articles.pagination import decode_cursor, encode_cursor
+from app.articles.router import load_page
+
+pytestmark = pytest.mark.anyio
+
+
+def test_cursor_round_trip():
+    values = (datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc), 42)
+
+    assert decode_cursor(encode_cursor("scheduled", values), "scheduled", 2) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor("archived", (datetime.now(timezone.utc), 1)),
+        encode_cursor("scheduled", (1,)),
+    ],
+)
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, "scheduled", 2)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "status, values",
+    [
+        ("scheduled", ("2026-10-18", 1)),
+        ("archived", (7, 1)),
+        ("archived", (datetime.now(timezone.utc), "1")),
+        ("published", ("1",)),
+    ],
+)
+async def test_load_page_rejects_mistyped_cursors(status, values):
+    with pytest.raises(HTTPException) as raised:
+        await load_page(None, status, "full", 10, encode_cursor(status, values), None)
+    assert raised.value.status_code == 400
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+from fastapi import HTTPException, Request, Response
+
+from app import rate_limiter
+from app.cache import LRUCache
+from app.config import env
+from app.rate_limiter import RateLimit, check_limit
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def redis_calls(fake_redis, monkeypatch):
+    monkeypatch.setattr(
+        rate_limiter, "local_buckets", LRUCache(maxsize=100, ttl=float("inf"))
+    )
+    calls = []
+    run_script = rate_limiter.run_script
+
+    async def counting_run_script(name, keys, args):
+        calls.append(keys[0])
+        return await run_script(name, keys, args)
+
+    monkeypatch.setattr(rate_limiter, "run_script", counting_run_script)
+    return calls
+
+
+async def exhaust(key: str, max_requests: int) -> list:
+    return [await check_limit(key, max_requests, 60) for _ in range(max_requests)]
+
+
+@pytest.mark.parametrize("batch, expected_calls", [(1, 10), (4, 3), (10, 1)])
+async def test_leases_batch_redis_calls(
+    redis_calls, monkeypatch, batch, expected_calls
+):
+    monkeypatch.setattr(env, "RATE_LIMIT_LOCAL_BATCH", batch)
+
+    results = await exhaust("k", 10)
+
+    assert all(result.allowed for result in results)
+    assert [result.remaining for result in results] == list(range(9, -1, -1))
+    assert len(redis_calls) == expected_calls
+
+
+async def test_rejections_are_cached_until_retry_after(redis_calls, monkeypatch):
+    monkeypatch.setattr(env, "RATE_LIMIT_LOCAL_BATCH", 5)
+    await exhaust("k", 5)
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as raised:
+            await check_limit("k", 5, 60)
+        assert raised.value.status_code == 429
+
+    assert len(redis_calls) == 2
+    assert raised.value.headers["Retry-After"] == "12"
+    bucket = rate_limiter.local_buckets.get("k")
+    assert bucket.retry_at - time.monotonic() == pytest.approx(12, abs=1)
+
+
+async def test_headers(redis_calls):
+    result = await check_limit("k", 2, 60)
+    assert result.headers() == {
+        "RateLimit-Limit": "2",
+        "RateLimit-Remaining": "1",
+        "RateLimit-Reset": "30",
+    }
+
+    await check_limit("k", 2, 60)
+    with pytest.raises(HTTPException) as raised:
+        await check_limit("k", 2, 60)
+
+    headers = raised.value.headers
+    assert headers["RateLimit-Remaining"] == "0"
+    assert headers["RateLimit-Reset"] == "60"
+    assert headers["Retry-After"] == "30"
+
+
+async def test_leftover_leases_expire_with_their_interval(redis_calls, monkeypatch):
+    monkeypatch.setattr(env, "RATE_LIMIT_LOCAL_BATCH", 4)
+    start = time.monotonic()
+
+    await check_limit("k", 10, 60)
+
+    # Four tokens advance the limit by 4 * 60 / 10 seconds
+    ((expires_at, bucket),) = rate_limiter.local_buckets._data.values()
+    assert bucket.tokens == 3
+    assert expires_at - start == pytest.approx(24, abs=1)
+
+
+async def test_headers_report_the_strictest_policy(redis_calls):
+    loose = RateLimit("loose", 10, 60)
+    strict = RateLimit("strict", 3, 60)
+    request = Request({"type": "http", "client": ("203.0.113.5", 1234), "headers": []})
+    response = Response()
+
+    await strict(request, response)
+    await loose(request, response)
+
+    assert response.headers["RateLimit-Limit"] == "3"
+    assert response.headers["RateLimit-Remaining"] == "2"
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from app.db import redis_cilent
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_subscriber_survives_failing_handlers(fake_redis, monkeypatch):
+    received = []
+
+    def failing(message: str):
+        int(message)
+
+    monkeypatch.setattr(
+        redis_cilent,
+        "subscriptions",
+        {"a": [failing, received.append], "b": [received.append]},
+    )
+    task = asyncio.create_task(redis_cilent._listen())
+    try:
+        while not await fake_redis.pubsub_numsub("a", "b") == [("a", 1), ("b", 1)]:
+            await asyncio.sleep(0.01)
+
+        await redis_cilent.publish("a", "not-a-number")
+        await redis_cilent.publish("b", "after")
+        for _ in range(100):
+            if len(received) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        assert received == ["not-a-number", "after"]
+        assert not task.done()
+    finally:
+        task.cancel()
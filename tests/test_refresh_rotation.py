@@ -0,0 +1,72 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth import create_token_pair, rotate_refresh_token
+from app.db import models
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(
+        not os.environ.get("TEST_DATABASE_URL"),
+        reason="set TEST_DATABASE_URL to a disposable Postgres database",
+    ),
+]
+
+
+@pytest.fixture
+async def sessionmaker():
+    engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            models.Base.metadata.create_all,
+            tables=[models.User.__table__, models.RefreshToken.__table__],
+        )
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def user_id(sessionmaker):
+    user_id = str(uuid.uuid4())
+    async with sessionmaker() as db:
+        db.add(models.User(id=user_id, phone_number=f"+1555{user_id[:8]}"))
+        await db.commit()
+    yield user_id
+    async with sessionmaker() as db:
+        await db.execute(
+            delete(models.RefreshToken).where(models.RefreshToken.user_id == user_id)
+        )
+        await db.execute(delete(models.User).where(models.User.id == user_id))
+        await db.commit()
+
+
+async def test_concurrent_rotation_of_one_token(fake_redis, sessionmaker, user_id):
+    async with sessionmaker() as db:
+        pair = await create_token_pair(user_id, db)
+
+    async def rotate():
+        async with sessionmaker() as db:
+            return await rotate_refresh_token(pair.refresh_token, db)
+
+    results = await asyncio.gather(rotate(), rotate(), return_exceptions=True)
+
+    assert sum(not isinstance(result, Exception) for result in results) == 1
+    assert sum(isinstance(result, HTTPException) for result in results) == 1
+
+    async with sessionmaker() as db:
+        tokens = (
+            await db.execute(
+                select(models.RefreshToken).where(
+                    models.RefreshToken.user_id == user_id
+                )
+            )
+        ).scalars()
+        revoked = [token.revoked for token in tokens]
+    assert len(revoked) == 2
+    assert all(revoked)
@@ -0,0 +1,47 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.auth.revocation import RevocationRegistry
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_revoke_and_check(fake_redis):
+    registry = RevocationRegistry(capacity=100)
+
+    await registry.revoke("family", timedelta(minutes=1))
+
+    assert await registry.is_revoked("family")
+    assert not await registry.is_revoked("other")
+    assert not await registry.is_revoked(None)
+
+
+async def test_rebuild_forgets_expired_families(fake_redis):
+    registry = RevocationRegistry(capacity=100)
+    await registry.revoke("expired", timedelta(seconds=-1))
+    await registry.revoke("live", timedelta(minutes=1))
+
+    await registry.rebuild()
+
+    assert "expired" not in registry.bloom
+    assert "live" in registry.bloom
+
+
+async def test_revocations_during_a_rebuild_are_kept(fake_redis, monkeypatch):
+    registry = RevocationRegistry(capacity=100)
+    zrangebyscore = fake_redis.zrangebyscore
+
+    async def slow_zrangebyscore(*args):
+        families = await zrangebyscore(*args)
+        # Arrives over pub/sub after Redis was read, before the swap
+        registry._on_revoked("late")
+        await asyncio.sleep(0)
+        return families
+
+    monkeypatch.setattr(fake_redis, "zrangebyscore", slow_zrangebyscore)
+    await registry.rebuild()
+
+    assert "late" in registry.bloom
+    assert registry._added_during_rebuild is None
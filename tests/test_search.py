@@ -0,0 +1,62 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.articles.pagination import encode_cursor
+from app.articles.search import CURSOR_SCOPE, search_query
+
+RANK = (
+    "ts_rank(articles.search_vector, websearch_to_tsquery('english'::regconfig, 'cat'))"
+)
+
+
+def compile(query) -> str:
+    sql = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    return " ".join(str(sql).split())
+
+
+def test_first_page():
+    sql = compile(search_query("cat", None, 10, None, highlight=False))
+
+    assert "articles.search_vector @@ websearch_to_tsquery" in sql
+    assert sql.endswith(f"ORDER BY {RANK} DESC, articles.id DESC LIMIT 10")
+    assert "ts_headline" not in sql
+    assert "articles.content" not in sql
+    assert "status" not in sql
+
+
+def test_cursor_page_uses_a_row_comparison():
+    after = encode_cursor(CURSOR_SCOPE, (0.25, 42))
+
+    sql = compile(search_query("cat", "published", 10, after, highlight=False))
+
+    assert f"({RANK}, articles.id) < (0.25, 42)" in sql
+    assert "articles.status = 'published'" in sql
+
+
+def test_headlines_are_computed_over_the_page_only():
+    sql = compile(search_query("cat", None, 10, None, highlight=True))
+
+    outer, inner = sql.split(" FROM (", 1)
+    assert "ts_headline('english'::regconfig, anon_1.content" in outer
+    assert "ts_headline" not in inner
+    assert "LIMIT 10) AS anon_1" in inner
+    assert sql.endswith("ORDER BY anon_1.rank DESC, anon_1.id DESC")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor(CURSOR_SCOPE, ("high", 42)),
+        encode_cursor(CURSOR_SCOPE, (0.25, "42")),
+        encode_cursor(CURSOR_SCOPE, (0.25,)),
+        encode_cursor("published", (0.25, 42)),
+        "garbage",
+    ],
+)
+def test_mistyped_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        search_query("cat", None, 10, cursor, highlight=False)
+    assert raised.value.status_code == 400